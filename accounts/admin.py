@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User
+from .models import User, StudentStats
 
 
 @admin.register(User)
@@ -13,3 +13,10 @@ class UserAdmin(BaseUserAdmin):
     add_fieldsets = BaseUserAdmin.add_fieldsets + (
         ('Custom Fields', {'fields': ('role', 'student_id', 'full_name')}),
     )
+
+
+@admin.register(StudentStats)
+class StudentStatsAdmin(admin.ModelAdmin):
+    list_display = ['student', 'exam_count', 'average_out_of_20', 'has_swot', 'last_activity']
+    list_filter = ['has_swot']
+    search_fields = ['student__username', 'student__full_name', 'student__student_id']
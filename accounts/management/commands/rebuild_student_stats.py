@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import User
+from accounts.stats import refresh_student_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized StudentStats row of every student'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Students recomputed per batch')
+
+    def handle(self, *args, **options):
+        students = User.objects.filter(role='student').order_by('id')
+        written = 0
+        last_id = 0
+        while True:
+            student_ids = list(
+                students.filter(id__gt=last_id).values_list('id', flat=True)[:options['chunk_size']]
+            )
+            if not student_ids:
+                break
+            last_id = student_ids[-1]
+            written += refresh_student_stats(student_ids)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {written} students'))
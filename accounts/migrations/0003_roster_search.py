@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:12
+
+from django.db import migrations, models
+
+
+def zero_missing_averages(apps, schema_editor):
+    StudentStats = apps.get_model("accounts", "StudentStats")
+    StudentStats.objects.filter(average_out_of_20__isnull=True).update(average_out_of_20=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_studentstats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="studentstats",
+            name="name_key",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="studentstats",
+            name="student_id_key",
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.RunPython(zero_missing_averages, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="studentstats",
+            name="average_out_of_20",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=5),
+        ),
+        migrations.AddIndex(
+            model_name="studentstats",
+            index=models.Index(
+                fields=["name_key", "id"], name="accounts_st_name_ke_b40f92_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentstats",
+            index=models.Index(
+                fields=["student_id_key", "id"], name="accounts_st_student_06a7fe_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentstats",
+            index=models.Index(
+                fields=["average_out_of_20", "id"],
+                name="accounts_st_average_8adf15_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentstats",
+            index=models.Index(
+                fields=["has_swot", "name_key", "id"],
+                name="accounts_st_has_swo_ca782a_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,96 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import Coalesce
+
+# A pure text function with no model access; the rest of the rebuild is
+# written out below against the historical models
+from accounts.search import normalize_search
+
+
+CHUNK_SIZE = 1000
+STAT_FIELDS = [
+    "name_key", "student_id_key", "exam_count", "score_sum", "possible_sum",
+    "average_out_of_20", "has_swot", "last_activity",
+]
+
+
+def _stats_for(apps, students):
+    StudentStats = apps.get_model("accounts", "StudentStats")
+    StudentExam = apps.get_model("exams", "StudentExam")
+    SWOTAnalysis = apps.get_model("swot", "SWOTAnalysis")
+
+    student_ids = [student.pk for student in students]
+    attempts = {
+        row["student_id"]: row
+        for row in StudentExam.objects.filter(
+            student_id__in=student_ids, status__in=("submitted", "graded"), score__isnull=False
+        ).values("student_id").annotate(
+            exam_count=Count("id"),
+            score_sum=Sum("score"),
+            possible_sum=Sum(Coalesce("total_marks", "exam__total_marks")),
+            last_submitted=Max("submitted_at"),
+        )
+    }
+    swot = dict(
+        SWOTAnalysis.objects.filter(student_id__in=student_ids, is_completed=True)
+        .values("student_id")
+        .annotate(last_completed=Max("completed_at"))
+        .values_list("student_id", "last_completed")
+    )
+
+    rows = []
+    for student in students:
+        name = student.full_name or f"{student.first_name} {student.last_name}" or student.username
+        stats = StudentStats(
+            student_id=student.pk,
+            name_key=normalize_search(name)[:255],
+            student_id_key=normalize_search(student.student_id)[:50],
+            has_swot=student.pk in swot,
+        )
+        row = attempts.get(student.pk)
+        if row:
+            stats.exam_count = row["exam_count"]
+            stats.score_sum = row["score_sum"]
+            stats.possible_sum = row["possible_sum"] or Decimal(0)
+            if stats.possible_sum > 0:
+                stats.average_out_of_20 = (stats.score_sum / stats.possible_sum * 20).quantize(Decimal("0.01"))
+        activity = [value for value in (row and row["last_submitted"], swot.get(student.pk)) if value]
+        stats.last_activity = max(activity) if activity else None
+        rows.append(stats)
+    return rows
+
+
+def fill_student_stats(apps, schema_editor):
+    User = apps.get_model("accounts", "User")
+    StudentStats = apps.get_model("accounts", "StudentStats")
+
+    students = User.objects.filter(role="student").order_by("id").only(
+        "username", "first_name", "last_name", "full_name", "student_id"
+    )
+    last_id = 0
+    while True:
+        chunk = list(students.filter(id__gt=last_id)[:CHUNK_SIZE])
+        if not chunk:
+            break
+        last_id = chunk[-1].pk
+        StudentStats.objects.bulk_create(
+            _stats_for(apps, chunk),
+            update_conflicts=True,
+            unique_fields=["student"],
+            update_fields=STAT_FIELDS,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_roster_search"),
+        ("exams", "0010_studentexam_question_ids"),
+        ("swot", "0002_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_student_stats, migrations.RunPython.noop),
+    ]
@@ -20,3 +20,32 @@ class User(AbstractUser):
     
     class Meta:
         db_table = 'users'
+
+
+class StudentStats(models.Model):
+    """Denormalized exam and SWOT totals per student, see accounts.stats"""
+    student = models.OneToOneField(User, on_delete=models.CASCADE, related_name='stats')
+    # Normalized copies of the student's name and id for roster search
+    # (see accounts.search.normalize_search)
+    name_key = models.CharField(max_length=255, blank=True)
+    student_id_key = models.CharField(max_length=50, blank=True)
+    exam_count = models.PositiveIntegerField(default=0)
+    score_sum = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    possible_sum = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # 0 until the student has a scored attempt (exam_count == 0)
+    average_out_of_20 = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    has_swot = models.BooleanField(default=False)
+    last_activity = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'Student stats'
+        indexes = [
+            models.Index(fields=['name_key', 'id']),
+            models.Index(fields=['student_id_key', 'id']),
+            models.Index(fields=['average_out_of_20', 'id']),
+            models.Index(fields=['has_swot', 'name_key', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.student.username} stats"
@@ -0,0 +1,39 @@
+"""
+Text normalization for roster search.
+
+Names typed on Arabic keyboards or pasted from other systems often use
+Arabic code points that look identical to the Persian ones (ي/ی, ك/ک),
+Persian or Arabic-Indic digits, diacritics, tatweel and zero-width
+non-joiners. Both the stored search keys (StudentStats.name_key and
+student_id_key) and the query go through normalize_search, so a prefix
+typed either way matches.
+"""
+import re
+
+
+_TRANSLATION = str.maketrans({
+    'ي': 'ی', 'ى': 'ی', 'ئ': 'ی',
+    'ك': 'ک',
+    'ة': 'ه', 'ۀ': 'ه',
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ؤ': 'و',
+    '\u200c': ' ', '\u200e': None, '\u200f': None, '\u0640': None,
+    **{chr(0x06F0 + digit): str(digit) for digit in range(10)},
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+})
+_DIACRITICS = re.compile('[\u064b-\u065f\u0670]')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_search(text):
+    """Fold a name or student id to the form used by roster search keys"""
+    text = _DIACRITICS.sub('', (text or '').translate(_TRANSLATION))
+    return _SPACES.sub(' ', text).strip().casefold()
+
+
+def prefix_range(prefix):
+    """
+    (lower, upper) bounds matching every string that starts with prefix,
+    so a prefix search is a plain B-tree range scan on any backend.
+    """
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
@@ -0,0 +1,55 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from exams.models import Exam, StudentExam
+from exams.signals import attempts_graded
+from swot.models import SWOTAnalysis
+from .models import User
+from .stats import COUNTED_STATUSES, USER_FIELDS, refresh_student_stats
+
+
+def _refresh_on_commit(student_ids):
+    student_ids = set(student_ids)
+    if student_ids:
+        transaction.on_commit(lambda: refresh_student_stats(student_ids))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Create the student's stats row and keep its search keys current"""
+    if instance.role != 'student':
+        return
+    # e.g. the last_login update at every login
+    if not created and update_fields is not None and not set(update_fields) & set(USER_FIELDS):
+        return
+    _refresh_on_commit([instance.pk])
+
+
+@receiver(attempts_graded)
+def attempts_graded_handler(sender, student_exam_ids, **kwargs):
+    _refresh_on_commit(
+        StudentExam.objects.filter(pk__in=student_exam_ids).values_list('student_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=StudentExam)
+def student_exam_deleted(sender, instance, **kwargs):
+    _refresh_on_commit([instance.student_id])
+
+
+@receiver(post_save, sender=SWOTAnalysis)
+@receiver(post_delete, sender=SWOTAnalysis)
+def swot_analysis_changed(sender, instance, **kwargs):
+    _refresh_on_commit([instance.student_id])
+
+
+@receiver(post_save, sender=Exam)
+def exam_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Total marks feed every scored attempt's possible_sum"""
+    if created or (update_fields is not None and 'total_marks' not in update_fields):
+        return
+    _refresh_on_commit(
+        StudentExam.objects.filter(exam=instance, status__in=COUNTED_STATUSES, score__isnull=False)
+        .values_list('student_id', flat=True)
+    )
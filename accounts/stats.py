@@ -0,0 +1,98 @@
+"""
+Per-student performance aggregates.
+
+StudentStats holds what the professor roster shows and searches for each
+student: normalized name and student id keys, the number of scored attempts,
+their score and possible totals, the average out of 20, whether a SWOT
+analysis was completed and the latest activity. Rows
+are recomputed from the source tables for a set of students in a fixed
+number of queries whenever a student is saved, an attempt is graded, a SWOT
+analysis is submitted or an exam's total marks change (see accounts.signals), and ``manage.py rebuild_student_stats``
+rebuilds them all.
+"""
+from decimal import Decimal
+
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import Coalesce
+
+from exams.models import StudentExam
+from swot.models import SWOTAnalysis
+from .models import User, StudentStats
+from .search import normalize_search
+
+
+COUNTED_STATUSES = ('submitted', 'graded')
+# User fields the stats row is built from
+USER_FIELDS = ('role', 'username', 'first_name', 'last_name', 'full_name', 'student_id')
+STAT_FIELDS = [
+    'name_key', 'student_id_key', 'exam_count', 'score_sum', 'possible_sum',
+    'average_out_of_20', 'has_swot', 'last_activity',
+]
+
+
+def display_name(student):
+    return student.full_name or f"{student.first_name} {student.last_name}" or student.username
+
+
+def average_out_of_20(score_sum, possible_sum):
+    if possible_sum <= 0:
+        return Decimal(0)
+    return (score_sum / possible_sum * 20).quantize(Decimal('0.01'))
+
+
+def refresh_student_stats(student_ids):
+    """Recompute StudentStats for the given students. Returns the number of rows written."""
+    students = {
+        student.pk: student
+        for student in User.objects.filter(pk__in=set(student_ids), role='student').only(*USER_FIELDS)
+    }
+    student_ids = list(students)
+    if not student_ids:
+        return 0
+
+    attempts = {
+        row['student_id']: row
+        for row in StudentExam.objects.filter(
+            student_id__in=student_ids,
+            status__in=COUNTED_STATUSES,
+            score__isnull=False
+        ).values('student_id').annotate(
+            exam_count=Count('id'),
+            score_sum=Sum('score'),
+            # Attempts drawn from a question pool store their own total
+            possible_sum=Sum(Coalesce('total_marks', 'exam__total_marks')),
+            last_submitted=Max('submitted_at')
+        )
+    }
+    swot = dict(
+        SWOTAnalysis.objects.filter(student_id__in=student_ids, is_completed=True)
+        .values('student_id')
+        .annotate(last_completed=Max('completed_at'))
+        .values_list('student_id', 'last_completed')
+    )
+
+    rows = []
+    for student_id, student in students.items():
+        row = attempts.get(student_id)
+        stats = StudentStats(
+            student_id=student_id,
+            name_key=normalize_search(display_name(student))[:255],
+            student_id_key=normalize_search(student.student_id)[:50],
+            has_swot=student_id in swot
+        )
+        if row:
+            stats.exam_count = row['exam_count']
+            stats.score_sum = row['score_sum']
+            stats.possible_sum = row['possible_sum'] or Decimal(0)
+            stats.average_out_of_20 = average_out_of_20(stats.score_sum, stats.possible_sum)
+        activity = [value for value in (row and row['last_submitted'], swot.get(student_id)) if value]
+        stats.last_activity = max(activity) if activity else None
+        rows.append(stats)
+
+    StudentStats.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['student'],
+        update_fields=STAT_FIELDS + ['updated_at']
+    )
+    return len(rows)
@@ -1,10 +1,18 @@
+from decimal import Decimal, InvalidOperation
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate, get_user_model
+from django.db.models import Q
+from backend.pagination import KeysetPagination
+from dashboard.counters import student_count
+from .models import StudentStats
+from .search import normalize_search, prefix_range
 from .serializers import StudentSignupSerializer, ProfessorLoginSerializer, UserSerializer
+from .stats import display_name
 
 User = get_user_model()
 
@@ -80,48 +88,86 @@ def get_student_count(request):
     if request.user.role != 'professor':
         return Response({'error': 'Only professors can access this'}, status=status.HTTP_403_FORBIDDEN)
     
-    count = User.objects.filter(role='student').count()
-    return Response({'count': count})
+    return Response({'count': student_count()})
+
+
+# Each ordering ends in id so the keyset cursor addresses one row even when
+# many students share a name or an average (see backend.pagination)
+ROSTER_ORDERINGS = {
+    'name': ('name_key', 'id'),
+    '-name': ('-name_key', '-id'),
+    'average': ('average_out_of_20', 'id'),
+    '-average': ('-average_out_of_20', '-id'),
+}
+
+
+def _parse_average_param(params, param):
+    value = params.get(param)
+    if not value:
+        return None
+    try:
+        average = Decimal(value)
+    except InvalidOperation:
+        raise ValidationError({param: 'Expected a number between 0 and 20'})
+    if not 0 <= average <= 20:
+        raise ValidationError({param: 'Expected a number between 0 and 20'})
+    return average
+
+
+def _filter_roster(queryset, params):
+    """Apply ?search=, ?has_swot=, ?min_average= and ?max_average="""
+    search = normalize_search(params.get('search', ''))
+    if search:
+        lower, upper = prefix_range(search)
+        queryset = queryset.filter(
+            Q(name_key__gte=lower, name_key__lt=upper) |
+            Q(student_id_key__gte=lower, student_id_key__lt=upper)
+        )
+    
+    has_swot = params.get('has_swot')
+    if has_swot is not None:
+        if has_swot.lower() not in ('true', 'false', '1', '0'):
+            raise ValidationError({'has_swot': 'Expected true or false'})
+        queryset = queryset.filter(has_swot=has_swot.lower() in ('true', '1'))
+    
+    min_average = _parse_average_param(params, 'min_average')
+    max_average = _parse_average_param(params, 'max_average')
+    if min_average is not None or max_average is not None:
+        # Students without a scored attempt have no average to compare
+        queryset = queryset.filter(exam_count__gt=0)
+    if min_average is not None:
+        queryset = queryset.filter(average_out_of_20__gte=min_average)
+    if max_average is not None:
+        queryset = queryset.filter(average_out_of_20__lte=max_average)
+    return queryset
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_all_students(request):
-    """Get all students with their details"""
+    """Search, filter and page through the student roster"""
     if request.user.role != 'professor':
         return Response({'error': 'Only professors can access this'}, status=status.HTTP_403_FORBIDDEN)
     
-    from swot.models import SWOTAnalysis
-    from exams.models import StudentExam
+    ordering = request.query_params.get('ordering', 'name')
+    if ordering not in ROSTER_ORDERINGS:
+        raise ValidationError({'ordering': f"Expected one of {', '.join(ROSTER_ORDERINGS)}"})
     
-    students = User.objects.filter(role='student').order_by('full_name')
-    
-    students_data = []
-    for student in students:
-        # Calculate average score from submitted exams
-        submitted_exams = StudentExam.objects.filter(
-            student=student,
-            status__in=['submitted', 'graded'],
-            score__isnull=False
-        )
-        
-        if submitted_exams.exists():
-            total_score = sum(exam.score for exam in submitted_exams if exam.score)
-            total_possible = sum(exam.exam.total_marks for exam in submitted_exams)
-            average = round((total_score / total_possible) * 20, 2) if total_possible > 0 else 0
-        else:
-            average = None
-        
-        # Check if student has SWOT analysis
-        has_swot = SWOTAnalysis.objects.filter(student=student, is_completed=True).exists()
-        
-        students_data.append({
-            'id': student.id,
-            'name': student.full_name or f"{student.first_name} {student.last_name}" or student.username,
-            'student_id': student.student_id or '-',
-            'average': average,
-            'has_swot': has_swot,
-            'exam_count': submitted_exams.count(),
-        })
+    # Every filter and ordering is served by a StudentStats index (see accounts.stats)
+    queryset = _filter_roster(StudentStats.objects.select_related('student'), request.query_params)
+    paginator = KeysetPagination()
+    paginator.ordering = ROSTER_ORDERINGS[ordering]
+    page = paginator.paginate_queryset(queryset, request)
     
-    return Response(students_data)
+    students_data = [
+        {
+            'id': stats.student_id,
+            'name': display_name(stats.student),
+            'student_id': stats.student.student_id or '-',
+            'average': stats.average_out_of_20 if stats.exam_count else None,
+            'has_swot': stats.has_swot,
+            'exam_count': stats.exam_count,
+        }
+        for stats in page
+    ]
+    return paginator.get_paginated_response(students_data)
@@ -0,0 +1,95 @@
+"""
+Database profiles, selected with the DB_PROFILE environment variable.
+
+* ``sqlite`` (default): the db.sqlite3 file (or DB_NAME) in WAL mode, so
+  readers do not block the writer, with ``synchronous=NORMAL``, a busy
+  timeout and larger page cache / mmap, applied to every new connection by
+  the connection_created receiver below. Write transactions start with
+  BEGIN IMMEDIATE so concurrent writers wait on busy_timeout instead of
+  failing to upgrade a read lock.
+* ``postgres``: DB_NAME, DB_USER, DB_PASSWORD, DB_HOST and DB_PORT, with
+  Django's native connection pool (DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE,
+  DB_POOL_TIMEOUT). The pool cannot be combined with persistent
+  connections, so with DB_POOL=false (e.g. behind pgbouncer) connections
+  are kept for DB_CONN_MAX_AGE seconds instead.
+
+Both profiles enable connection health checks.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+PROFILES = ('sqlite', 'postgres')
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # milliseconds
+    'cache_size': -20000,  # KiB per connection
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _env_flag(name, default):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+def sqlite_config(base_dir):
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DB_NAME') or base_dir / 'db.sqlite3',
+        'CONN_MAX_AGE': _env_int('DB_CONN_MAX_AGE', 60),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+
+
+def postgres_config():
+    pooled = _env_flag('DB_POOL', True)
+    config = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('DB_NAME', 'azmooneh_db'),
+        'USER': os.environ.get('DB_USER', 'azmooneh_user'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        'CONN_MAX_AGE': 0 if pooled else _env_int('DB_CONN_MAX_AGE', 60),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+    if pooled:
+        config['OPTIONS']['pool'] = {
+            'min_size': _env_int('DB_POOL_MIN_SIZE', 2),
+            'max_size': _env_int('DB_POOL_MAX_SIZE', 10),
+            'timeout': _env_int('DB_POOL_TIMEOUT', 10),
+        }
+    return config
+
+
+def database_config(profile, base_dir):
+    """The DATABASES['default'] entry for a profile"""
+    if profile == 'sqlite':
+        return sqlite_config(base_dir)
+    if profile == 'postgres':
+        return postgres_config()
+    raise ImproperlyConfigured(f"DB_PROFILE must be one of {', '.join(PROFILES)}, not {profile!r}")
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to every new SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,126 @@
+import datetime
+import decimal
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+def _reverse_ordering(ordering):
+    return tuple(order[1:] if order.startswith('-') else f'-{order}' for order in ordering)
+
+
+class _PositionEncoder(json.JSONEncoder):
+    """Full-precision ISO datetimes and exact decimals for cursor positions"""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.date)):
+            return o.isoformat()
+        if isinstance(o, decimal.Decimal):
+            return str(o)
+        return super().default(o)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination shared by the API's list endpoints.
+
+    Pages are addressed by an opaque ``cursor`` built from the ordering
+    columns, so each page is a single indexed range scan no matter how deep
+    the client pages, and rows inserted meanwhile do not shift later pages.
+    Views can set ``pagination_ordering`` to columns backed by an index;
+    the default is newest first by ``created_at`` with ``id`` as tie-breaker.
+
+    Unlike DRF's CursorPagination, which positions the cursor on the first
+    ordering column only and skips ties with an offset, the cursor holds the
+    values of every ordering column and pages continue after that row, e.g.
+    ``average > a OR (average = a AND id > b)``. Orderings must therefore
+    use non-null columns and end in a unique one such as ``id``. Values are
+    stored with their JSON types (datetimes and decimals as ISO strings,
+    which the lookups convert back), so numbers compare as numbers.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', 'id')
+
+    def get_ordering(self, request, queryset, view):
+        return getattr(view, 'pagination_ordering', None) or self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = tuple(self.get_ordering(request, queryset, view))
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            queryset = queryset.filter(self._after_position(ordering, current_position))
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _after_position(self, ordering, position):
+        """Rows strictly after ``position`` in ``ordering``, compared column by column"""
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(ordering) or None in values:
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal = {}
+        for order, value in zip(ordering, values):
+            field = order.lstrip('-')
+            lookup = 'lt' if order.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field = order.lstrip('-')
+            value = instance[field] if isinstance(instance, dict) else getattr(instance, field)
+            values.append(value)
+        return json.dumps(values, cls=_PositionEncoder, separators=(',', ':'))
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .db import database_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,6 +47,8 @@ INSTALLED_APPS = [
     "exams",
     "swot",
     "student_messages",
+    "dashboard",
+    "events",
 ]
 
 MIDDLEWARE = [
@@ -79,12 +84,13 @@ WSGI_APPLICATION = "backend.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
+# DB_PROFILE picks a tuned SQLite file (default) or pooled PostgreSQL; see
+# backend/db.py for the other DB_* variables.
+
+DATABASE_PROFILE = os.environ.get("DB_PROFILE", "sqlite")
 
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+    "default": database_config(DATABASE_PROFILE, BASE_DIR),
 }
 
 
@@ -142,6 +148,51 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Exams
+# Submitted attempts are queued and graded by `python manage.py grade_worker`,
+# a required process alongside the web workers: nothing else drains the
+# queue. Set to False to grade inside submit_exam instead.
+EXAMS_GRADE_IN_BACKGROUND = True
+
+# Answer writes are refused this long after an attempt's deadline; attempts
+# past it are submitted by `python manage.py sweep_expired_attempts`.
+EXAMS_DEADLINE_GRACE_SECONDS = 30
+
+# Write-behind buffer for answer autosaves (see exams/answer_buffer.py).
+# Buffers live in the cache alias below; it must be shared by all workers.
+# Writes to it are serialized by the attempt's row lock, not by the cache.
+EXAMS_ANSWER_BUFFER_ENABLED = False
+EXAMS_ANSWER_BUFFER_CACHE = 'answer_buffer'
+EXAMS_ANSWER_BUFFER_FLUSH_INTERVAL = 30  # seconds
+EXAMS_ANSWER_BUFFER_MAX_ENTRIES = 50
+
+# Server-sent events (see events/bus.py). Streams check the events table this
+# often for events published by other processes; streams served without an
+# event loop (WSGI, runserver) poll at the same rate and close after
+# EVENTS_SYNC_STREAM_SECONDS so they do not hold a worker forever.
+EVENTS_POLL_INTERVAL = 5  # seconds
+EVENTS_SYNC_STREAM_SECONDS = 60
+
+# Cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'answer_buffer': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('ANSWER_BUFFER_CACHE_LOCATION', '/var/tmp/azmooneh_answer_buffer'),
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    # Dashboard counters are invalidated by deleting entries, so this cache
+    # must be shared by all workers (file, database or Redis, not locmem)
+    'dashboard': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('DASHBOARD_CACHE_LOCATION', '/var/tmp/azmooneh_dashboard'),
+    },
+}
+DASHBOARD_COUNTER_CACHE = 'dashboard'
+
 # JWT Settings
 from datetime import timedelta
 
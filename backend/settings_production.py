@@ -38,14 +38,6 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
 # Database - PostgreSQL for production (recommended)
-# Uncomment and configure if using PostgreSQL
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.postgresql',
-#         'NAME': os.environ.get('DB_NAME', 'azmooneh_db'),
-#         'USER': os.environ.get('DB_USER', 'azmooneh_user'),
-#         'PASSWORD': os.environ.get('DB_PASSWORD', ''),
-#         'HOST': os.environ.get('DB_HOST', 'localhost'),
-#         'PORT': os.environ.get('DB_PORT', '5432'),
-#     }
-# }
+# Set DB_PROFILE=postgres and DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT;
+# connections are pooled (see backend/db.py). Without it the tuned SQLite
+# profile from settings.py is used.
@@ -24,4 +24,6 @@ urlpatterns = [
     path("api/", include('exams.urls')),
     path("api/swot/", include('swot.urls')),
     path("api/", include('student_messages.urls')),
+    path("api/dashboard/", include('dashboard.urls')),
+    path("api/events/", include('events.urls')),
 ]
@@ -0,0 +1,80 @@
+"""
+Cached counters for the professor dashboard.
+
+Each count lives in its own cache entry. Signals (see dashboard.signals)
+delete an entry whenever a row it counts is saved or deleted, and the next
+read recounts it; entries also expire after DASHBOARD_COUNTER_TIMEOUT
+seconds, which covers bulk updates that send no signals. Unread messages
+are read from student_messages' UnreadCounter table instead.
+
+Entries are deleted rather than versioned, so they must live in a cache
+shared by every worker (DASHBOARD_COUNTER_CACHE); a per-process cache would
+only be invalidated in the worker that handled the write.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from accounts.models import User
+from exams.models import Exam, StudentExam
+from student_messages.unread import unread_count
+
+
+CACHE_TIMEOUT = getattr(settings, 'DASHBOARD_COUNTER_TIMEOUT', 5 * 60)
+CACHE_ALIAS = getattr(settings, 'DASHBOARD_COUNTER_CACHE', 'dashboard')
+
+STUDENTS_KEY = 'dashboard:students'
+
+
+def exams_key(professor_id):
+    return f'dashboard:exams:{professor_id}'
+
+
+def pending_key(professor_id):
+    return f'dashboard:pending-gradings:{professor_id}'
+
+
+def _queries(professor_id):
+    return {
+        STUDENTS_KEY: lambda: User.objects.filter(role='student').count(),
+        exams_key(professor_id): lambda: Exam.objects.filter(professor_id=professor_id).count(),
+        pending_key(professor_id): lambda: StudentExam.objects.filter(
+            exam__professor_id=professor_id, status='submitted'
+        ).count(),
+    }
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _read(queries):
+    """Fetch cached counts in one round trip and recount the missing ones"""
+    values = _cache().get_many(list(queries))
+    missing = {key: query() for key, query in queries.items() if key not in values}
+    if missing:
+        _cache().set_many(missing, CACHE_TIMEOUT)
+        values.update(missing)
+    return values
+
+
+def get_counters(professor):
+    """All dashboard counts for a professor"""
+    values = _read(_queries(professor.pk))
+    return {
+        'students': values[STUDENTS_KEY],
+        'exams': values[exams_key(professor.pk)],
+        'pending_gradings': values[pending_key(professor.pk)],
+        # Already O(1) from student_messages' counter table
+        'unread_messages': unread_count(professor),
+    }
+
+
+def student_count():
+    return _read({STUDENTS_KEY: _queries(None)[STUDENTS_KEY]})[STUDENTS_KEY]
+
+
+def invalidate(*keys):
+    """Drop counters once the current transaction commits"""
+    if keys:
+        transaction.on_commit(lambda: _cache().delete_many(keys))
@@ -0,0 +1,40 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.models import User
+from exams.models import Exam, StudentExam
+from exams.signals import attempts_submitted, attempts_graded
+from .counters import STUDENTS_KEY, exams_key, pending_key, invalidate
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate(STUDENTS_KEY)
+
+
+@receiver(post_save, sender=Exam)
+@receiver(post_delete, sender=Exam)
+def exam_changed(sender, instance, created=False, **kwargs):
+    if created or kwargs['signal'] is post_delete:
+        invalidate(exams_key(instance.professor_id), pending_key(instance.professor_id))
+
+
+@receiver(post_save, sender=StudentExam)
+@receiver(post_delete, sender=StudentExam)
+def student_exam_changed(sender, instance, **kwargs):
+    if StudentExam.exam.is_cached(instance):
+        professor_id = instance.exam.professor_id
+    else:
+        professor_id = Exam.objects.filter(pk=instance.exam_id).values_list('professor_id', flat=True).first()
+    if professor_id is not None:
+        invalidate(pending_key(professor_id))
+
+
+@receiver(attempts_submitted)
+@receiver(attempts_graded)
+def attempts_status_changed(sender, student_exam_ids, **kwargs):
+    professor_ids = set(
+        Exam.objects.filter(student_exams__in=student_exam_ids).values_list('professor_id', flat=True)
+    )
+    invalidate(*[pending_key(professor_id) for professor_id in professor_ids])
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('counters/', views.counters, name='dashboard_counters'),
+]
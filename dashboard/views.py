@@ -0,0 +1,15 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from .counters import get_counters
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def counters(request):
+    """Student, exam, pending grading and unread message counts in one call"""
+    if request.user.role != 'professor':
+        return Response({'error': 'Only professors can access this'}, status=status.HTTP_403_FORBIDDEN)
+    
+    return Response(get_counters(request.user))
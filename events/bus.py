@@ -0,0 +1,90 @@
+"""
+In-process pub/sub for server-sent events, backed by the Event table.
+
+publish() stores one Event row per recipient and, once the surrounding
+transaction commits, pushes the events onto the asyncio queues of streams
+open in this process. A push only wakes the stream, which then reads the
+table after its cursor, so events always go out in id order. Streams also
+poll the table every EVENTS_POLL_INTERVAL seconds, which picks up events
+published by other processes (e.g. ``grade_worker``) and serves the
+synchronous stream used under WSGI or ``runserver``, where no event loop is
+listening.
+"""
+import asyncio
+import json
+import threading
+
+from django.db import transaction
+
+from .models import Event
+
+
+_subscribers = {}
+_subscribers_lock = threading.Lock()
+
+
+def serialize(event):
+    return {
+        'id': event.pk,
+        'user_id': event.user_id,
+        'type': event.event_type,
+        'data': event.payload,
+    }
+
+
+def format_event(event):
+    """Encode a serialized event as a text/event-stream frame"""
+    data = json.dumps(event['data'], ensure_ascii=False, default=str)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+def subscribe(user_id):
+    """Register a queue on the running event loop for a user's events"""
+    queue = asyncio.Queue()
+    with _subscribers_lock:
+        _subscribers.setdefault(user_id, set()).add((asyncio.get_running_loop(), queue))
+    return queue
+
+
+def unsubscribe(user_id, queue):
+    with _subscribers_lock:
+        subscribers = _subscribers.get(user_id, set())
+        subscribers.difference_update({entry for entry in subscribers if entry[1] is queue})
+        if not subscribers:
+            _subscribers.pop(user_id, None)
+
+
+def _deliver(events):
+    for event in events:
+        with _subscribers_lock:
+            subscribers = list(_subscribers.get(event['user_id'], ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+
+def publish(event_type, recipients):
+    """
+    Store and push one event per (user_id, payload) pair. Events are
+    delivered to open streams only after the current transaction commits.
+    """
+    events = Event.objects.bulk_create([
+        Event(user_id=user_id, event_type=event_type, payload=payload)
+        for user_id, payload in recipients
+    ])
+    # Backends that do not return ids from bulk_create rely on polling
+    serialized = [serialize(event) for event in events if event.pk is not None]
+    if serialized:
+        transaction.on_commit(lambda: _deliver(serialized))
+    return len(events)
+
+
+def latest_event_id(user_id):
+    return Event.objects.filter(user_id=user_id).order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def events_after(user_id, after_id, limit=100):
+    """A user's stored events with ids above after_id, oldest first"""
+    return [
+        serialize(event)
+        for event in Event.objects.filter(user_id=user_id, id__gt=after_id).order_by('id')[:limit]
+    ]
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import models
+
+
+class Event(models.Model):
+    """A server-sent event addressed to one user, see events.bus"""
+    TYPE_CHOICES = (
+        ('message.created', 'Message created'),
+        ('message.read', 'Message read'),
+        ('exam.graded', 'Exam graded'),
+    )
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='events')
+    event_type = models.CharField(max_length=50, choices=TYPE_CHOICES)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['user', 'id']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type} -> {self.user_id}"
@@ -0,0 +1,49 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from exams.models import StudentExam
+from exams.signals import attempts_graded
+from student_messages.models import Message
+from student_messages.signals import message_read
+from .bus import publish
+
+
+@receiver(post_save, sender=Message)
+def message_created(sender, instance, created, **kwargs):
+    """Tell the addressed professor, or every professor for unassigned messages"""
+    if not created:
+        return
+    if instance.professor_id:
+        professor_ids = [instance.professor_id]
+    else:
+        professor_ids = User.objects.filter(role='professor').values_list('id', flat=True)
+    payload = {
+        'id': instance.pk,
+        'title': instance.title,
+        'student': instance.student_id,
+        'professor': instance.professor_id,
+        'created_at': instance.created_at.isoformat(),
+    }
+    publish('message.created', [(professor_id, payload) for professor_id in professor_ids])
+
+
+@receiver(message_read)
+def message_marked_read(sender, message, **kwargs):
+    publish('message.read', [(message.student_id, {'id': message.pk})])
+
+
+@receiver(attempts_graded)
+def attempts_graded_handler(sender, student_exam_ids, **kwargs):
+    attempts = StudentExam.objects.filter(pk__in=student_exam_ids).values_list(
+        'id', 'student_id', 'exam_id', 'status', 'score'
+    )
+    publish('exam.graded', [
+        (student_id, {
+            'id': student_exam_id,
+            'exam': exam_id,
+            'status': status,
+            'score': None if score is None else str(score),
+        })
+        for student_exam_id, student_id, exam_id, status, score in attempts
+    ])
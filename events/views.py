@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from . import bus
+
+
+POLL_INTERVAL = getattr(settings, 'EVENTS_POLL_INTERVAL', 5)
+# Streams served by a WSGI worker hold a thread, so they end after this long
+# and EventSource reconnects with Last-Event-ID
+SYNC_STREAM_SECONDS = getattr(settings, 'EVENTS_SYNC_STREAM_SECONDS', 60)
+RETRY_MS = 3000
+KEEP_ALIVE = ': keep-alive\n\n'
+
+
+def _authenticate(request):
+    """
+    Resolve the user from an access token. EventSource cannot send headers,
+    so ?token= is accepted besides the usual Authorization header.
+    """
+    auth = JWTAuthentication()
+    raw_token = request.GET.get('token')
+    if not raw_token:
+        header = auth.get_header(request)
+        raw_token = header and auth.get_raw_token(header)
+    if not raw_token:
+        return None
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def _last_event_id(request, user_id):
+    """Resume after Last-Event-ID, or start with events published from now on"""
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return bus.latest_event_id(user_id)
+
+
+async def _async_stream(user_id, cursor):
+    """
+    Poll the table for events, woken early by pushes from the in-process bus.
+    Events are only ever sent from the table in id order, so the id a client
+    resumes from never skips past events it has not received.
+    """
+    queue = bus.subscribe(user_id)
+    loop = asyncio.get_running_loop()
+    events_after = sync_to_async(bus.events_after, thread_sensitive=False)
+    next_poll = loop.time() + POLL_INTERVAL
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        while True:
+            try:
+                pushed = await asyncio.wait_for(queue.get(), max(0, next_poll - loop.time()))
+            except asyncio.TimeoutError:
+                pushed = None
+            else:
+                # One read covers every push that arrived meanwhile
+                newest = pushed['id']
+                while not queue.empty():
+                    newest = max(newest, queue.get_nowait()['id'])
+                if newest <= cursor:
+                    continue
+
+            events = await events_after(user_id, cursor)
+            next_poll = loop.time() + POLL_INTERVAL
+            if events:
+                cursor = events[-1]['id']
+            frames = ''.join(bus.format_event(event) for event in events)
+            if frames or pushed is None:
+                yield frames or KEEP_ALIVE
+    finally:
+        bus.unsubscribe(user_id, queue)
+
+
+def _sync_stream(user_id, cursor):
+    """Poll the table; used when no event loop serves the request"""
+    deadline = time.monotonic() + SYNC_STREAM_SECONDS
+    yield f'retry: {RETRY_MS}\n\n'
+    while time.monotonic() < deadline:
+        events = bus.events_after(user_id, cursor)
+        if events:
+            cursor = events[-1]['id']
+        yield ''.join(bus.format_event(event) for event in events) or KEEP_ALIVE
+        time.sleep(POLL_INTERVAL)
+
+
+@require_GET
+def event_stream(request):
+    """text/event-stream of message.created, message.read and exam.graded events"""
+    user = _authenticate(request)
+    if user is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided or are invalid'}, status=401)
+
+    cursor = _last_event_id(request, user.pk)
+    if isinstance(request, ASGIRequest):
+        stream = _async_stream(user.pk, cursor)
+    else:
+        stream = _sync_stream(user.pk, cursor)
+
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Exam, Question, Choice, StudentExam, Answer
+from .models import Exam, Question, QuestionPoolRule, Choice, StudentExam, Answer, GradingJob
 
 
 class ChoiceInline(admin.TabularInline):
@@ -12,18 +12,24 @@ class QuestionInline(admin.StackedInline):
     extra = 1
 
 
+class QuestionPoolRuleInline(admin.TabularInline):
+    model = QuestionPoolRule
+    extra = 0
+
+
 @admin.register(Exam)
 class ExamAdmin(admin.ModelAdmin):
     list_display = ['title', 'professor', 'duration_minutes', 'total_marks', 'is_published', 'created_at']
     list_filter = ['is_published', 'created_at']
     search_fields = ['title', 'professor__username']
-    inlines = [QuestionInline]
+    inlines = [QuestionPoolRuleInline, QuestionInline]
 
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ['exam', 'question_type', 'marks', 'order']
+    list_display = ['exam', 'question_type', 'tag', 'marks', 'order']
     list_filter = ['question_type', 'exam']
+    search_fields = ['tag']
     inlines = [ChoiceInline]
 
 
@@ -38,3 +44,9 @@ class StudentExamAdmin(admin.ModelAdmin):
 class AnswerAdmin(admin.ModelAdmin):
     list_display = ['student_exam', 'question', 'marks_obtained']
     list_filter = ['student_exam__exam']
+
+
+@admin.register(GradingJob)
+class GradingJobAdmin(admin.ModelAdmin):
+    list_display = ['student_exam', 'status', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status']
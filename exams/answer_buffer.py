@@ -0,0 +1,158 @@
+"""
+Optional write-behind buffer for answer autosaves.
+
+When EXAMS_ANSWER_BUFFER_ENABLED is set, submit_answer(s) merge entries into
+a cache-backed buffer keyed by StudentExam instead of writing to the
+database. A buffer is flushed through exams.answers.save_answers when it
+holds EXAMS_ANSWER_BUFFER_MAX_ENTRIES questions, when it is older than
+EXAMS_ANSWER_BUFFER_FLUSH_INTERVAL seconds, when the attempt is submitted,
+by ``manage.py flush_answer_buffer`` and when the process exits cleanly.
+Reads of an in-progress attempt overlay the buffered answers.
+
+Cache backends do not offer an atomic read-modify-write (FileBasedCache's
+add() is a has_key() followed by set()), so every change to a buffer is
+made while holding the attempt's row lock: SELECT ... FOR UPDATE, or the
+BEGIN IMMEDIATE write lock of the sqlite profile. Autosaves check the
+attempt's status under that lock and submission flushes and changes the
+status under it, so an autosave can never land in the buffer of an
+attempt that has been submitted.
+
+StudentExam.buffered_since marks the attempts that have a buffer, which is
+how flush_all finds them, and names the buffer's cache key. A flush clears
+it in the same transaction that writes the answers and only drops the old
+key once that commits: if the transaction rolls back the buffer is still
+there, and later autosaves start a new key that the drop cannot touch.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from .answers import save_answers
+from .models import StudentExam
+
+
+logger = logging.getLogger(__name__)
+
+# Buffers are dropped once flushed; this only bounds ones orphaned by a crash
+BUFFER_TIMEOUT = 60 * 60 * 24
+
+_flushed_on_exit = set()
+_flushed_on_exit_lock = threading.Lock()
+
+
+class AttemptClosed(Exception):
+    """Answers were sent for an attempt that is no longer in progress"""
+
+
+def is_enabled():
+    return getattr(settings, 'EXAMS_ANSWER_BUFFER_ENABLED', False)
+
+
+def _cache():
+    return caches[getattr(settings, 'EXAMS_ANSWER_BUFFER_CACHE', 'default')]
+
+
+def _buffer_key(student_exam_id, buffered_since):
+    return f'exams:answer-buffer:{student_exam_id}:{buffered_since.timestamp():.6f}'
+
+
+def _lock_attempt(student_exam_id):
+    """Lock the attempt's row for the current transaction; None if it is gone"""
+    return StudentExam.objects.select_for_update().filter(pk=student_exam_id).values(
+        'status', 'buffered_since'
+    ).first()
+
+
+def buffered_answers(student_exam):
+    """{question_id: entry} waiting to be written for an attempt"""
+    if student_exam.buffered_since is None:
+        return {}
+    buffer = _cache().get(_buffer_key(student_exam.pk, student_exam.buffered_since))
+    return buffer['answers'] if buffer else {}
+
+
+def buffer_answers(student_exam_id, entries):
+    """
+    Merge validated entries into the attempt's buffer, flushing it when it
+    is full or old enough. Returns True when the buffer was flushed. Raises
+    AttemptClosed once the attempt has been submitted.
+    """
+    with transaction.atomic():
+        attempt = _lock_attempt(student_exam_id)
+        if attempt is None or attempt['status'] in ('submitted', 'graded'):
+            raise AttemptClosed(student_exam_id)
+
+        buffered_since = attempt['buffered_since']
+        if buffered_since is None:
+            buffered_since = timezone.now()
+            StudentExam.objects.filter(pk=student_exam_id).update(buffered_since=buffered_since)
+
+        key = _buffer_key(student_exam_id, buffered_since)
+        buffer = _cache().get(key) or {'answers': {}}
+        for entry in entries:
+            buffer['answers'][entry['question_id']] = {
+                'question_id': entry['question_id'],
+                'selected_choices': list(entry['selected_choices']),
+                'text_answer': entry.get('text_answer') or '',
+            }
+        _cache().set(key, buffer, BUFFER_TIMEOUT)
+
+    with _flushed_on_exit_lock:
+        _flushed_on_exit.add(student_exam_id)
+
+    max_entries = getattr(settings, 'EXAMS_ANSWER_BUFFER_MAX_ENTRIES', 50)
+    interval = getattr(settings, 'EXAMS_ANSWER_BUFFER_FLUSH_INTERVAL', 30)
+    if len(buffer['answers']) >= max_entries or (timezone.now() - buffered_since).total_seconds() >= interval:
+        flush_attempt(student_exam_id)
+        return True
+    return False
+
+
+def flush_attempt(student_exam_id):
+    """
+    Write an attempt's buffered answers to the database. Called inside a
+    transaction the row lock is kept until that transaction ends, which is
+    how submission changes the status before a waiting autosave reads it.
+    """
+    with transaction.atomic():
+        attempt = _lock_attempt(student_exam_id)
+        if attempt is None or attempt['buffered_since'] is None:
+            written = 0
+        else:
+            key = _buffer_key(student_exam_id, attempt['buffered_since'])
+            buffer = _cache().get(key)
+            written = len(buffer['answers']) if buffer else 0
+            if written:
+                save_answers(student_exam_id, list(buffer['answers'].values()))
+            StudentExam.objects.filter(pk=student_exam_id).update(buffered_since=None)
+            transaction.on_commit(lambda: _cache().delete(key))
+
+    with _flushed_on_exit_lock:
+        _flushed_on_exit.discard(student_exam_id)
+    return written
+
+
+def flush_all():
+    """Flush every buffered attempt. Returns the number of answers written."""
+    written = 0
+    for student_exam_id in StudentExam.objects.filter(buffered_since__isnull=False).values_list('id', flat=True):
+        written += flush_attempt(student_exam_id)
+    return written
+
+
+@atexit.register
+def _flush_on_exit():
+    if not is_enabled():
+        return
+    with _flushed_on_exit_lock:
+        pending = list(_flushed_on_exit)
+    for student_exam_id in pending:
+        try:
+            flush_attempt(student_exam_id)
+        except Exception:
+            logger.exception('Could not flush buffered answers for attempt %s', student_exam_id)
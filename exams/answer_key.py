@@ -0,0 +1,130 @@
+"""
+Compiled, versioned answer keys.
+
+An answer key maps question id -> KeyEntry(question_type, marks, correct,
+bits, correct_mask) for every auto-graded question of an exam, where bits
+maps each choice id to its bit in Answer.choice_mask. Keys are cached per
+(exam id, exam version) in a small process-local LRU backed by the Django
+cache, so grading, regrading and analytics never re-read Choice.is_correct
+while the exam is unchanged. Saving or deleting a Question or Choice bumps
+Exam.version (see exams.signals), which moves readers on to a fresh key.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Exam, Question, Choice
+
+
+AUTO_GRADED_TYPES = ('single_choice', 'true_false', 'multiple_choice')
+
+KeyEntry = namedtuple('KeyEntry', ['question_type', 'marks', 'correct', 'bits', 'correct_mask'])
+
+# Bits available in Answer.choice_mask (a signed 64-bit integer)
+MAX_MASK_CHOICES = 62
+
+CACHE_TIMEOUT = getattr(settings, 'EXAMS_ANSWER_KEY_CACHE_TIMEOUT', 60 * 60 * 24)
+LOCAL_CACHE_SIZE = getattr(settings, 'EXAMS_ANSWER_KEY_LOCAL_SIZE', 128)
+
+_local_keys = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _cache_key(exam_id, version):
+    return f'exams:answer-key:v2:{exam_id}:{version}'
+
+
+def choice_bits(choice_ids):
+    """
+    Map a question's choice ids to bit values by ascending id. Choices
+    added later get higher bits, so existing masks stay valid; questions
+    with more choices than fit in a BigIntegerField get None.
+    """
+    ordered = sorted(choice_ids)
+    if len(ordered) > MAX_MASK_CHOICES:
+        return None
+    return {choice_id: 1 << position for position, choice_id in enumerate(ordered)}
+
+
+def mask_for(entry, selected):
+    """Bitmask of selected choice ids for a key entry, or None if it cannot be encoded"""
+    if entry.bits is None:
+        return None
+    mask = 0
+    for choice_id in selected:
+        bit = entry.bits.get(choice_id)
+        if bit is None:
+            return None
+        mask |= bit
+    return mask
+
+
+def compile_answer_key(exam_id):
+    """Build {question_id: KeyEntry} from the database in two queries"""
+    entries = {
+        question_id: (question_type, marks, [], set())
+        for question_id, question_type, marks in Question.objects.filter(
+            exam_id=exam_id,
+            question_type__in=AUTO_GRADED_TYPES
+        ).values_list('id', 'question_type', 'marks')
+    }
+
+    choices = Choice.objects.filter(
+        question__exam_id=exam_id,
+        question__question_type__in=AUTO_GRADED_TYPES
+    ).values_list('question_id', 'id', 'is_correct')
+    for question_id, choice_id, is_correct in choices:
+        entries[question_id][2].append(choice_id)
+        if is_correct:
+            entries[question_id][3].add(choice_id)
+
+    answer_key = {}
+    for question_id, (question_type, marks, choice_ids, correct) in entries.items():
+        bits = choice_bits(choice_ids)
+        correct_mask = None if bits is None else sum(bits[choice_id] for choice_id in correct)
+        answer_key[question_id] = KeyEntry(question_type, marks, frozenset(correct), bits, correct_mask)
+    return answer_key
+
+
+def get_answer_key(exam_id, version=None):
+    """
+    Return the compiled answer key for an exam. The result is shared
+    between callers and must be treated as read-only.
+
+    Pass the exam's version when it is already loaded to skip the version
+    lookup. The version is always read before the key is compiled, so a
+    cached key is never older than the version it is stored under.
+    """
+    if version is None:
+        version = Exam.objects.filter(pk=exam_id).values_list('version', flat=True).first()
+        if version is None:
+            return {}
+
+    local_key = (exam_id, version)
+    with _local_lock:
+        answer_key = _local_keys.get(local_key)
+        if answer_key is not None:
+            _local_keys.move_to_end(local_key)
+            return answer_key
+
+    answer_key = cache.get(_cache_key(exam_id, version))
+    if answer_key is None:
+        answer_key = compile_answer_key(exam_id)
+        cache.set(_cache_key(exam_id, version), answer_key, CACHE_TIMEOUT)
+
+    with _local_lock:
+        _local_keys[local_key] = answer_key
+        _local_keys.move_to_end(local_key)
+        while len(_local_keys) > LOCAL_CACHE_SIZE:
+            _local_keys.popitem(last=False)
+
+    return answer_key
+
+
+def invalidate_answer_key(exam_id):
+    """Drop every locally cached version of an exam's key"""
+    with _local_lock:
+        for local_key in [k for k in _local_keys if k[0] == exam_id]:
+            del _local_keys[local_key]
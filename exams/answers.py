@@ -0,0 +1,124 @@
+"""
+Bulk answer writes for in-progress attempts.
+
+A batch of {question_id, selected_choices, text_answer} entries is checked
+against the exam in two queries and saved with one upsert plus a rewrite of
+the selected_choices through rows, so an autosave costs the same number of
+queries whether it carries one answer or a whole exam. Choice questions also
+get a bitmask (Answer.choice_mask) that grading compares against the
+compiled answer key.
+"""
+from django.db import transaction
+
+from .answer_key import get_answer_key, mask_for
+from .models import Question, Choice, StudentExam, Answer
+
+
+def validate_answer_entries(exam_id, entries, allowed_question_ids=None):
+    """
+    Return (unknown_question_ids, foreign_choice_ids) for a batch of entries:
+    questions that are not part of the exam (or not among
+    allowed_question_ids, the questions drawn for a pooled attempt), and
+    selected choices that do not belong to the question they were sent for.
+    """
+    question_ids = {entry['question_id'] for entry in entries}
+    requested = question_ids if allowed_question_ids is None else question_ids & set(allowed_question_ids)
+    known_questions = set(
+        Question.objects.filter(exam_id=exam_id, id__in=requested).values_list('id', flat=True)
+    )
+
+    choice_ids = {choice_id for entry in entries for choice_id in entry['selected_choices']}
+    choice_owner = dict(
+        Choice.objects.filter(id__in=choice_ids, question_id__in=known_questions)
+        .values_list('id', 'question_id')
+    ) if choice_ids else {}
+
+    unknown_questions = sorted(question_ids - known_questions)
+    foreign_choices = sorted({
+        choice_id
+        for entry in entries if entry['question_id'] in known_questions
+        for choice_id in entry['selected_choices']
+        if choice_owner.get(choice_id) != entry['question_id']
+    })
+    return unknown_questions, foreign_choices
+
+
+def _choice_mask(answer_key, question_id, selected_choices):
+    entry = answer_key.get(question_id)
+    return None if entry is None else mask_for(entry, selected_choices)
+
+
+def save_answers(student_exam_id, entries, answer_key=None):
+    """
+    Upsert answers for validated entries and replace their selected choices,
+    storing each choice-question answer's bitmask alongside the M2M rows.
+    Later entries for the same question win. Returns {question_id: answer_id}.
+    """
+    latest = {entry['question_id']: entry for entry in entries}
+    if not latest:
+        return {}
+
+    if answer_key is None:
+        exam_id = StudentExam.objects.filter(pk=student_exam_id).values_list('exam_id', flat=True).first()
+        answer_key = get_answer_key(exam_id)
+
+    through = Answer.selected_choices.through
+    with transaction.atomic():
+        answers = Answer.objects.bulk_create(
+            [
+                Answer(
+                    student_exam_id=student_exam_id,
+                    question_id=question_id,
+                    text_answer=entry.get('text_answer') or '',
+                    choice_mask=_choice_mask(answer_key, question_id, entry['selected_choices'])
+                )
+                for question_id, entry in latest.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['student_exam', 'question'],
+            update_fields=['text_answer', 'choice_mask']
+        )
+        answer_ids = {answer.question_id: answer.pk for answer in answers}
+        if None in answer_ids.values():
+            # Backends that cannot return ids from an upsert
+            answer_ids = dict(
+                Answer.objects.filter(student_exam_id=student_exam_id, question_id__in=latest)
+                .values_list('question_id', 'id')
+            )
+
+        through.objects.filter(answer_id__in=answer_ids.values()).delete()
+        through.objects.bulk_create([
+            through(answer_id=answer_ids[question_id], choice_id=choice_id)
+            for question_id, entry in latest.items()
+            for choice_id in set(entry['selected_choices'])
+        ])
+
+    return answer_ids
+
+
+def rebuild_choice_masks(answers):
+    """
+    Recompute choice_mask from selected_choices for an Answer queryset, e.g.
+    after a choice was deleted or the M2M was edited directly.
+    """
+    rows = list(answers.values_list('id', 'question_id', 'student_exam__exam_id'))
+    if not rows:
+        return 0
+
+    selected = {}
+    through = Answer.selected_choices.through.objects.filter(
+        answer_id__in=[answer_id for answer_id, _, _ in rows]
+    ).values_list('answer_id', 'choice_id')
+    for answer_id, choice_id in through:
+        selected.setdefault(answer_id, set()).add(choice_id)
+
+    answer_keys = {}
+    updated = []
+    for answer_id, question_id, exam_id in rows:
+        if exam_id not in answer_keys:
+            answer_keys[exam_id] = get_answer_key(exam_id)
+        mask = _choice_mask(answer_keys[exam_id], question_id, selected.get(answer_id, ()))
+        updated.append(Answer(pk=answer_id, choice_mask=mask))
+
+    Answer.objects.bulk_update(updated, ['choice_mask'], batch_size=1000)
+    return len(updated)
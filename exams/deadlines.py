@@ -0,0 +1,79 @@
+"""
+Server-side exam deadlines.
+
+start_exam stores StudentExam.deadline (started_at + the exam's duration).
+Answer writes are refused once it has passed (allowing
+EXAMS_DEADLINE_GRACE_SECONDS for requests in flight), and
+``manage.py sweep_expired_attempts`` finds every open attempt past its
+deadline with one range scan on the (status, deadline) index, marks the
+batch submitted with one UPDATE and hands it to grading.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import answer_buffer
+from .grading import grade_student_exam
+from .jobs import enqueue_grading
+from .models import StudentExam
+from .signals import attempts_submitted
+
+
+OPEN_STATUSES = ('not_started', 'in_progress')
+
+
+def deadline_for(exam, started_at):
+    return started_at + timedelta(minutes=exam.duration_minutes)
+
+
+def is_past_deadline(student_exam, now=None):
+    """True when the attempt's deadline plus the grace period has passed"""
+    if student_exam.deadline is None:
+        return False
+    grace = timedelta(seconds=getattr(settings, 'EXAMS_DEADLINE_GRACE_SECONDS', 30))
+    return (now or timezone.now()) > student_exam.deadline + grace
+
+
+def sweep_expired_attempts(now=None, batch_size=500):
+    """
+    Submit open attempts whose deadline has passed and queue them for
+    grading (or grade them here when EXAMS_GRADE_IN_BACKGROUND is off).
+    Returns the number of attempts submitted.
+    """
+    now = now or timezone.now()
+    swept = 0
+    while True:
+        with transaction.atomic():
+            expired = list(
+                StudentExam.objects.select_for_update(skip_locked=True)
+                .filter(status__in=OPEN_STATUSES, deadline__lte=now)
+                .order_by('deadline')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not expired:
+                break
+
+            if answer_buffer.is_enabled():
+                # The rows are locked until the status change commits, so
+                # autosaves sent within the grace period are refused
+                for student_exam_id in expired:
+                    answer_buffer.flush_attempt(student_exam_id)
+
+            # Recorded as submitted at the deadline, not when the sweep ran
+            StudentExam.objects.filter(id__in=expired, status__in=OPEN_STATUSES).update(
+                status='submitted',
+                submitted_at=F('deadline')
+            )
+            attempts_submitted.send(sender=StudentExam, student_exam_ids=expired)
+
+            if getattr(settings, 'EXAMS_GRADE_IN_BACKGROUND', True):
+                enqueue_grading(expired)
+            else:
+                for student_exam in StudentExam.objects.select_related('exam').filter(id__in=expired):
+                    grade_student_exam(student_exam)
+
+        swept += len(expired)
+    return swept
@@ -0,0 +1,60 @@
+"""
+Streaming gradebook export.
+
+One CSV row per attempt: student details, status, score and the marks for
+every question of the exam. Attempts are walked with .iterator() and the
+marks of each chunk are loaded with a single query, so memory stays bounded
+however many students took the exam.
+"""
+import csv
+
+from .models import Question, StudentExam, Answer
+from .streaming import UTF8_BOM, Echo, iter_chunks
+
+
+def _display_name(student):
+    return student.full_name or f"{student.first_name} {student.last_name}".strip() or student.username
+
+
+def export_gradebook(exam, chunk_size=1000):
+    """Yield the exam's gradebook as CSV text"""
+    questions = list(
+        Question.objects.filter(exam=exam).order_by('order', 'id').values_list('id', 'order')
+    )
+    question_ids = [question_id for question_id, _ in questions]
+
+    writer = csv.writer(Echo())
+    yield UTF8_BOM + writer.writerow(
+        ['student_id', 'name', 'username', 'status', 'started_at', 'submitted_at', 'score']
+        + [f'Q{order}' for _, order in questions]
+    )
+
+    attempts = (
+        StudentExam.objects.filter(exam=exam)
+        .select_related('student')
+        .order_by('student__full_name', 'id')
+        .iterator(chunk_size=chunk_size)
+    )
+    for chunk in iter_chunks(attempts, chunk_size):
+        marks = {}
+        rows = Answer.objects.filter(student_exam__in=chunk).values_list(
+            'student_exam_id', 'question_id', 'marks_obtained'
+        )
+        for student_exam_id, question_id, value in rows:
+            marks[(student_exam_id, question_id)] = value
+
+        yield ''.join(
+            writer.writerow([
+                attempt.student.student_id or '',
+                _display_name(attempt.student),
+                attempt.student.username,
+                attempt.status,
+                attempt.started_at.isoformat() if attempt.started_at else '',
+                attempt.submitted_at.isoformat() if attempt.submitted_at else '',
+                '' if attempt.score is None else attempt.score,
+            ] + [
+                '' if marks.get((attempt.pk, question_id)) is None else marks[(attempt.pk, question_id)]
+                for question_id in question_ids
+            ])
+            for attempt in chunk
+        )
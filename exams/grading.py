@@ -0,0 +1,228 @@
+"""
+Set-based auto-grading for objective questions.
+
+An attempt is graded with a fixed number of queries regardless of how many
+questions the exam has: the answer key comes from exams.answer_key, the
+attempt's selections are loaded in bulk, scored in memory and written back
+with one bulk_update plus one score update.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .answer_key import get_answer_key, mask_for
+from .models import StudentExam, Answer
+from .signals import attempts_graded
+
+
+def load_selections(student_exam_ids, answer_key):
+    """
+    Load {answer_id: (student_exam_id, question_id, selected)} for every
+    answer of the given attempts. ``selected`` is the answer's choice bitmask,
+    or a frozenset of choice ids when no mask can be used; through rows are
+    only read for answers without a stored mask.
+    """
+    selections = {}
+    unmasked = []
+    rows = Answer.objects.filter(student_exam_id__in=student_exam_ids).values_list(
+        'id', 'student_exam_id', 'question_id', 'choice_mask'
+    )
+    for answer_id, student_exam_id, question_id, choice_mask in rows:
+        entry = answer_key.get(question_id)
+        if entry is not None and (choice_mask is None or entry.bits is None):
+            selections[answer_id] = (student_exam_id, question_id, set())
+            unmasked.append(answer_id)
+        else:
+            selections[answer_id] = (student_exam_id, question_id, choice_mask)
+
+    if unmasked:
+        through = Answer.selected_choices.through.objects.filter(
+            answer_id__in=unmasked
+        ).values_list('answer_id', 'choice_id')
+        for answer_id, choice_id in through:
+            selections[answer_id][2].add(choice_id)
+        for answer_id in unmasked:
+            student_exam_id, question_id, selected = selections[answer_id]
+            mask = mask_for(answer_key[question_id], selected)
+            selections[answer_id] = (
+                student_exam_id, question_id, frozenset(selected) if mask is None else mask
+            )
+
+    return selections
+
+
+def score_answer(entry, selected):
+    """Marks earned for one answer against its key entry"""
+    if isinstance(selected, int):
+        if entry.question_type == 'multiple_choice':
+            return entry.marks if selected == entry.correct_mask else Decimal(0)
+        # Single choice / true-false: the lowest selected choice must be the
+        # first correct one; with bits ordered by choice id that is the
+        # lowest set bit of each mask.
+        if selected and entry.correct_mask and (selected & -selected) == (entry.correct_mask & -entry.correct_mask):
+            return entry.marks
+        return Decimal(0)
+
+    if entry.question_type == 'multiple_choice':
+        return entry.marks if selected == entry.correct else Decimal(0)
+
+    if selected and entry.correct and min(selected) == min(entry.correct):
+        return entry.marks
+    return Decimal(0)
+
+
+def score_selections(answer_key, selections):
+    """
+    Score answers in memory.
+
+    Returns ({answer_id: marks}, {student_exam_id: total}). Answers to
+    questions that are not auto-graded are left out of both.
+    """
+    marks = {}
+    totals = {}
+    for answer_id, (student_exam_id, question_id, selected) in selections.items():
+        totals.setdefault(student_exam_id, Decimal(0))
+        entry = answer_key.get(question_id)
+        if entry is None:
+            continue
+        earned = score_answer(entry, selected)
+        marks[answer_id] = earned
+        totals[student_exam_id] += earned
+    return marks, totals
+
+
+def grade_student_exam(student_exam):
+    """Auto-grade one attempt and mark it as graded"""
+    answer_key = get_answer_key(student_exam.exam_id, student_exam.exam.version)
+    selections = load_selections([student_exam.pk], answer_key)
+    marks, _ = score_selections(answer_key, selections)
+
+    with transaction.atomic():
+        Answer.objects.bulk_update(
+            [Answer(pk=answer_id, marks_obtained=value) for answer_id, value in marks.items()],
+            ['marks_obtained']
+        )
+        # Sum in the database so marks a professor already gave to long
+        # answers (e.g. while the job was queued) are kept in the score.
+        student_exam.score = Answer.objects.filter(student_exam_id=student_exam.pk).aggregate(
+            total=Coalesce(Sum('marks_obtained'), Decimal(0))
+        )['total']
+        student_exam.status = 'graded'
+        student_exam.graded_at = timezone.now()
+        StudentExam.objects.filter(pk=student_exam.pk).update(
+            score=student_exam.score,
+            status=student_exam.status,
+            graded_at=student_exam.graded_at
+        )
+
+    attempts_graded.send(sender=StudentExam, student_exam_ids=[student_exam.pk])
+    return student_exam.score
+
+
+def load_current_marks(student_exam_ids):
+    """{answer_id: marks_obtained} for every answer of the given attempts"""
+    return dict(
+        Answer.objects.filter(student_exam_id__in=student_exam_ids)
+        .values_list('id', 'marks_obtained')
+    )
+
+
+def diff_regrade(selections, current_marks, new_marks, current_scores):
+    """
+    Compare freshly scored marks with what is stored.
+
+    Returns (changed_marks, changed_scores): answers whose marks differ and
+    attempts whose total (auto-graded plus manually graded answers) differs.
+    """
+    changed_marks = {
+        answer_id: value
+        for answer_id, value in new_marks.items()
+        if current_marks.get(answer_id) != value
+    }
+
+    totals = {student_exam_id: Decimal(0) for student_exam_id in current_scores}
+    for answer_id, (student_exam_id, _, _) in selections.items():
+        value = new_marks.get(answer_id, current_marks.get(answer_id))
+        if value is not None:
+            totals[student_exam_id] += value
+
+    changed_scores = {
+        student_exam_id: total
+        for student_exam_id, total in totals.items()
+        if current_scores[student_exam_id] != total
+    }
+    return changed_marks, changed_scores
+
+
+def write_regrade(changed_marks, changed_scores):
+    """Persist only the marks and scores that changed"""
+    with transaction.atomic():
+        Answer.objects.bulk_update(
+            [Answer(pk=answer_id, marks_obtained=value) for answer_id, value in changed_marks.items()],
+            ['marks_obtained']
+        )
+        StudentExam.objects.bulk_update(
+            [StudentExam(pk=student_exam_id, score=score) for student_exam_id, score in changed_scores.items()],
+            ['score']
+        )
+        if changed_marks or changed_scores:
+            StudentExam.objects.filter(
+                Q(pk__in=changed_scores) | Q(answers__in=changed_marks)
+            ).update(graded_at=timezone.now())
+
+    if changed_scores:
+        attempts_graded.send(sender=StudentExam, student_exam_ids=list(changed_scores))
+
+
+def find_foreign_answers(marks_by_attempt):
+    """
+    Check {student_exam_id: {answer_id: marks}} in one query and return the
+    answer ids that do not belong to the attempt they were sent for.
+    """
+    answer_ids = [answer_id for marks in marks_by_attempt.values() for answer_id in marks]
+    owners = dict(Answer.objects.filter(id__in=answer_ids).values_list('id', 'student_exam_id'))
+    return sorted(
+        answer_id
+        for student_exam_id, marks in marks_by_attempt.items()
+        for answer_id in marks
+        if owners.get(answer_id) != student_exam_id
+    )
+
+
+def apply_manual_marks(marks_by_attempt):
+    """
+    Write professor-given marks for {student_exam_id: {answer_id: marks}},
+    recompute each attempt's score with a database aggregate and mark it
+    graded. Returns {student_exam_id: score}.
+    """
+    with transaction.atomic():
+        Answer.objects.bulk_update(
+            [
+                Answer(pk=answer_id, marks_obtained=value)
+                for marks in marks_by_attempt.values()
+                for answer_id, value in marks.items()
+            ],
+            ['marks_obtained']
+        )
+
+        scores = {student_exam_id: Decimal(0) for student_exam_id in marks_by_attempt}
+        scores.update(
+            Answer.objects.filter(student_exam_id__in=scores)
+            .values('student_exam_id')
+            .annotate(total=Coalesce(Sum('marks_obtained'), Decimal(0)))
+            .values_list('student_exam_id', 'total')
+        )
+        graded_at = timezone.now()
+        StudentExam.objects.bulk_update(
+            [
+                StudentExam(pk=student_exam_id, score=score, status='graded', graded_at=graded_at)
+                for student_exam_id, score in scores.items()
+            ],
+            ['score', 'status', 'graded_at']
+        )
+
+    attempts_graded.send(sender=StudentExam, student_exam_ids=list(scores))
+    return scores
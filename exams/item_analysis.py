@@ -0,0 +1,224 @@
+"""
+Item analysis for an exam's graded attempts.
+
+The marks and choice masks of every graded attempt are loaded in a couple of
+queries into a students x questions matrix, and all statistics are computed
+with NumPy array operations. With question pools, questions an attempt did
+not draw are missing (NaN) rather than scored 0, so each statistic only
+counts the attempts that were asked the question:
+
+* difficulty: mean marks / question marks (the p-value for 0/1 items)
+* discrimination: difference in difficulty between the top and bottom 27%
+  of students by total score (as a share of their drawn marks)
+* point_biserial: correlation between the question's marks and the rest of
+  the total (corrected item-total correlation)
+* choices: how often each choice was picked overall and by the top and
+  bottom groups, which shows distractors nobody picks or that attract
+  strong students
+
+Results are cached per exam version and last grading time, so they are
+recomputed only after the exam or its marks change.
+"""
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .answer_key import get_answer_key, mask_for
+from .models import Question, Choice, StudentExam, Answer
+
+
+CACHE_TIMEOUT = getattr(settings, 'EXAMS_ITEM_ANALYSIS_CACHE_TIMEOUT', 60 * 60 * 24)
+GROUP_FRACTION = 0.27
+
+
+def _cache_key(exam, graded):
+    last_graded = graded['last_graded'].timestamp() if graded['last_graded'] else 0
+    return f'exams:item-analysis:{exam.pk}:{exam.version}:{last_graded}:{graded["attempts"]}'
+
+
+def _number(value, digits=4):
+    """Round a NumPy scalar for JSON, mapping NaN to None"""
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits)
+
+
+def load_score_matrix(exam, answer_key):
+    """
+    Return (attempt_ids, questions, scores, masks) for the exam's graded
+    attempts: ``scores`` is a float matrix of marks (NaN where the attempt
+    did not draw the question) and ``masks`` an int64 matrix of choice masks
+    (-1 where unanswered, not drawn or not encodable), both with one row per
+    attempt and one column per question.
+    """
+    questions = list(
+        Question.objects.filter(exam=exam).order_by('order', 'id')
+        .values_list('id', 'order', 'question_type', 'marks')
+    )
+    attempts = list(
+        StudentExam.objects.filter(exam=exam, status='graded').order_by('id').values_list('id', 'question_ids')
+    )
+    attempt_ids = [attempt_id for attempt_id, _ in attempts]
+    rows = {attempt_id: index for index, attempt_id in enumerate(attempt_ids)}
+    columns = {question[0]: index for index, question in enumerate(questions)}
+
+    scores = np.zeros((len(attempt_ids), len(questions)))
+    masks = np.full((len(attempt_ids), len(questions)), -1, dtype=np.int64)
+    for row, (_, question_ids) in enumerate(attempts):
+        # Attempts without a stored draw were asked every question
+        if question_ids is not None:
+            scores[row] = np.nan
+            scores[row, [columns[question_id] for question_id in question_ids if question_id in columns]] = 0
+
+    unmasked = {}
+    # Only the attempts read above: one graded since then has no row yet
+    answers = Answer.objects.filter(student_exam_id__in=attempt_ids).values_list(
+        'id', 'student_exam_id', 'question_id', 'marks_obtained', 'choice_mask'
+    )
+    for answer_id, student_exam_id, question_id, marks_obtained, choice_mask in answers:
+        if question_id not in columns:
+            continue
+        cell = (rows[student_exam_id], columns[question_id])
+        if np.isnan(scores[cell]):
+            continue
+        if marks_obtained is not None:
+            scores[cell] = marks_obtained
+        entry = answer_key.get(question_id)
+        if entry is None or entry.bits is None:
+            continue
+        if choice_mask is None:
+            unmasked[answer_id] = (cell, set())
+        else:
+            masks[cell] = choice_mask
+
+    if unmasked:
+        through = Answer.selected_choices.through.objects.filter(
+            answer_id__in=unmasked
+        ).values_list('answer_id', 'choice_id')
+        for answer_id, choice_id in through:
+            unmasked[answer_id][1].add(choice_id)
+        for cell, selected in unmasked.values():
+            mask = mask_for(answer_key[questions[cell[1]][0]], selected)
+            if mask is not None:
+                masks[cell] = mask
+
+    return attempt_ids, questions, scores, masks
+
+
+def _masked_mean(values, drawn):
+    """Column means over the drawn cells only (NaN for columns nobody drew)"""
+    return (values * drawn).sum(axis=0) / drawn.sum(axis=0)
+
+
+def _choice_statistics(entry, masks, drawn, upper, lower, choice_texts):
+    """Per-choice pick counts for one question's column of masks"""
+    choice_ids = sorted(entry.bits, key=entry.bits.get)
+    bits = np.array([entry.bits[choice_id] for choice_id in choice_ids], dtype=np.int64)
+    picked = (masks[:, None] >= 0) & ((masks[:, None] & bits[None, :]) != 0)
+
+    total = picked.sum(axis=0)
+    answered = int((masks >= 0).sum())
+    upper_picked = picked[upper].sum(axis=0)
+    lower_picked = picked[lower].sum(axis=0)
+    upper_drawn = int(drawn[upper].sum()) or np.nan
+    lower_drawn = int(drawn[lower].sum()) or np.nan
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        proportion = total / (answered or np.nan)
+        discrimination = upper_picked / upper_drawn - lower_picked / lower_drawn
+
+    return [
+        {
+            'choice_id': choice_id,
+            'choice_text': choice_texts.get(choice_id, ''),
+            'is_correct': choice_id in entry.correct,
+            'count': int(total[index]),
+            'proportion': _number(proportion[index]),
+            'upper_count': int(upper_picked[index]),
+            'lower_count': int(lower_picked[index]),
+            'discrimination': _number(discrimination[index]),
+        }
+        for index, choice_id in enumerate(choice_ids)
+    ]
+
+
+def compute_item_analysis(exam):
+    """Compute item statistics for every question of an exam"""
+    answer_key = get_answer_key(exam.pk, exam.version)
+    attempt_ids, questions, scores, masks = load_score_matrix(exam, answer_key)
+    choice_texts = dict(
+        Choice.objects.filter(question__exam=exam, question_id__in=answer_key).values_list('id', 'choice_text')
+    )
+
+    count = len(attempt_ids)
+    max_marks = np.array([float(question[3]) for question in questions])
+    drawn = ~np.isnan(scores)
+    scores = np.where(drawn, scores, 0)
+    totals = scores.sum(axis=1)
+    possible = (drawn * max_marks).sum(axis=1)
+
+    # Top and bottom 27% by the share of their drawn marks, which orders
+    # attempts of a fixed exam by total score
+    group_size = max(1, round(count * GROUP_FRACTION)) if count >= 2 else 0
+    ranking = np.argsort(np.divide(totals, possible, out=np.zeros(count), where=possible > 0), kind='stable')
+    lower = ranking[:group_size]
+    upper = ranking[count - group_size:] if group_size else ranking[:0]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        safe_marks = np.where(max_marks > 0, max_marks, np.nan)
+        mean_marks = _masked_mean(scores, drawn)
+        difficulty = mean_marks / safe_marks
+        discrimination = (
+            _masked_mean(scores[upper], drawn[upper]) - _masked_mean(scores[lower], drawn[lower])
+        ) / safe_marks
+
+        # Correlate each question with the total of the other questions,
+        # over the attempts that drew it
+        rest = totals[:, None] - scores
+        item_dev = np.where(drawn, scores - mean_marks, 0)
+        rest_dev = np.where(drawn, rest - _masked_mean(rest, drawn), 0)
+        point_biserial = (item_dev * rest_dev).sum(axis=0) / np.sqrt(
+            (item_dev ** 2).sum(axis=0) * (rest_dev ** 2).sum(axis=0)
+        )
+
+    items = []
+    for index, (question_id, order, question_type, marks) in enumerate(questions):
+        entry = answer_key.get(question_id)
+        items.append({
+            'question_id': question_id,
+            'order': order,
+            'question_type': question_type,
+            'marks': str(marks),
+            'drawn': int(drawn[:, index].sum()),
+            'answered': int((masks[:, index] >= 0).sum()) if entry is not None else None,
+            'mean_marks': _number(mean_marks[index]),
+            'difficulty': _number(difficulty[index]),
+            'discrimination': _number(discrimination[index]),
+            'point_biserial': _number(point_biserial[index]),
+            'choices': (
+                _choice_statistics(entry, masks[:, index], drawn[:, index], upper, lower, choice_texts)
+                if entry is not None and entry.bits is not None else None
+            ),
+        })
+
+    return {
+        'exam_id': exam.pk,
+        'attempt_count': count,
+        'group_size': group_size,
+        'mean_score': _number(totals.mean()) if count else None,
+        'std_score': _number(totals.std()) if count else None,
+        'questions': items,
+    }
+
+
+def get_item_analysis(exam):
+    """Return the exam's item analysis, computing it on a cache miss"""
+    graded = StudentExam.objects.filter(exam=exam, status='graded').aggregate(
+        attempts=Count('id'), last_graded=Max('graded_at')
+    )
+    key = _cache_key(exam, graded)
+    analysis = cache.get(key)
+    if analysis is None:
+        analysis = compute_item_analysis(exam)
+        cache.set(key, analysis, CACHE_TIMEOUT)
+    return analysis
@@ -0,0 +1,78 @@
+"""
+DB-backed grading queue.
+
+submit_exam records the attempt and enqueues a GradingJob; the
+``grade_worker`` management command claims pending jobs and grades them in
+a thread or process pool. Claiming is a conditional UPDATE tagged with a
+worker token, so several workers can share the table without a broker or
+SELECT ... FOR UPDATE support.
+"""
+import uuid
+
+from django.conf import settings
+from django.utils import timezone
+
+from .grading import grade_student_exam
+from .models import GradingJob, StudentExam
+
+
+MAX_ATTEMPTS = getattr(settings, 'EXAMS_GRADING_MAX_ATTEMPTS', 3)
+
+
+def enqueue_grading(student_exam_ids):
+    """Queue one pending grading job per attempt"""
+    return GradingJob.objects.bulk_create([
+        GradingJob(student_exam_id=student_exam_id)
+        for student_exam_id in student_exam_ids
+    ])
+
+
+def claim_jobs(limit, worker_token=None):
+    """Atomically claim up to ``limit`` pending jobs and return their ids"""
+    worker_token = worker_token or uuid.uuid4().hex
+    candidates = list(
+        GradingJob.objects.filter(status='pending')
+        .order_by('created_at')
+        .values_list('id', flat=True)[:limit]
+    )
+    if not candidates:
+        return []
+
+    GradingJob.objects.filter(id__in=candidates, status='pending').update(
+        status='running',
+        claimed_by=worker_token,
+        started_at=timezone.now()
+    )
+    return list(
+        GradingJob.objects.filter(id__in=candidates, claimed_by=worker_token, status='running')
+        .values_list('id', flat=True)
+    )
+
+
+def run_job(job_id):
+    """Grade the attempt behind a claimed job. Returns the final job status."""
+    job = GradingJob.objects.get(pk=job_id)
+    try:
+        student_exam = StudentExam.objects.select_related('exam').get(pk=job.student_exam_id)
+        grade_student_exam(student_exam)
+    except Exception as exc:
+        job.attempts += 1
+        job.error = repr(exc)
+        job.status = 'pending' if job.attempts < MAX_ATTEMPTS else 'failed'
+        job.claimed_by = ''
+        job.save(update_fields=['attempts', 'error', 'status', 'claimed_by'])
+        return job.status
+
+    job.attempts += 1
+    job.status = 'done'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['attempts', 'status', 'finished_at'])
+    return job.status
+
+
+def release_stale_jobs(older_than):
+    """Return jobs stuck in 'running' (e.g. after a killed worker) to the queue"""
+    return GradingJob.objects.filter(status='running', started_at__lt=older_than).update(
+        status='pending',
+        claimed_by=''
+    )
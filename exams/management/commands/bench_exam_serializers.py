@@ -0,0 +1,105 @@
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework import serializers
+
+from accounts.models import User
+from exams.models import Exam, Question, Choice
+from exams.serializers import exam_serializer_for
+
+
+class _LegacyChoiceSerializer(serializers.ModelSerializer):
+    """The previous ChoiceSerializer, which checked the role for every choice"""
+    class Meta:
+        model = Choice
+        fields = ['id', 'choice_text', 'is_correct']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        request = self.context.get('request')
+        if request and hasattr(request, 'user'):
+            if request.user.role == 'student':
+                data.pop('is_correct', None)
+        return data
+
+
+class _LegacyQuestionSerializer(serializers.ModelSerializer):
+    choices = _LegacyChoiceSerializer(many=True)
+
+    class Meta:
+        model = Question
+        fields = ['id', 'question_type', 'question_text', 'marks', 'order', 'choices']
+
+
+class _LegacyExamSerializer(serializers.ModelSerializer):
+    questions = _LegacyQuestionSerializer(many=True)
+    professor_name = serializers.CharField(source='professor.username')
+
+    class Meta:
+        model = Exam
+        fields = ['id', 'title', 'description', 'professor', 'professor_name',
+                  'duration_minutes', 'total_marks', 'is_published',
+                  'created_at', 'updated_at', 'questions']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare serializer throughput (rows/second) for a student reading a large exam'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=100)
+        parser.add_argument('--choices', type=int, default=4)
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        # Build a throwaway exam inside a transaction that is rolled back
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, options):
+        professor = User(username='bench_professor', role='professor')
+        professor.save()
+        student = User(username='bench_student', role='student')
+        exam = Exam.objects.create(title='Benchmark', professor=professor, duration_minutes=60)
+        questions = Question.objects.bulk_create([
+            Question(exam=exam, question_type='single_choice', question_text=f'Question {i}', marks=1, order=i)
+            for i in range(options['questions'])
+        ])
+        Choice.objects.bulk_create([
+            Choice(question=question, choice_text=f'Choice {j}', is_correct=(j == 0))
+            for question in questions
+            for j in range(options['choices'])
+        ])
+
+        exam = (Exam.objects.select_related('professor')
+                .prefetch_related('questions__choices').get(pk=exam.pk))
+        context = {'request': SimpleNamespace(user=student)}
+        rows = options['questions'] * (options['choices'] + 1)
+
+        results = {}
+        for label, serializer_class in (
+            ('before (per-choice role check)', _LegacyExamSerializer),
+            ('after (role-specific serializer)', exam_serializer_for(student.role)),
+        ):
+            serializer_class(exam, context=context).data  # warm up
+            started = time.perf_counter()
+            for _ in range(options['iterations']):
+                serializer_class(exam, context=context).data
+            elapsed = time.perf_counter() - started
+            results[label] = rows * options['iterations'] / elapsed
+
+        self.stdout.write(f"{options['questions']} questions x {options['choices']} choices, "
+                          f"{options['iterations']} iterations")
+        for label, rate in results.items():
+            self.stdout.write(f'  {label:<34} {rate:>12,.0f} rows/s')
+        before, after = results.values()
+        self.stdout.write(self.style.SUCCESS(f'Speed-up: {after / before:.2f}x'))
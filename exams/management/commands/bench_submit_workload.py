@@ -0,0 +1,187 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import User
+from backend.db import PROFILES, SQLITE_PRAGMAS
+from exams.models import Exam, Question, Choice
+from exams.views import StudentExamViewSet
+
+
+STEPS = ('start_exam', 'submit_answers', 'submit_exam')
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = ('Run the exam submit workload (start, autosaves, submit) from concurrent students '
+            'against the configured database profile, grading as EXAMS_GRADE_IN_BACKGROUND says')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=50)
+        parser.add_argument('--questions', type=int, default=30)
+        parser.add_argument('--autosaves', type=int, default=5,
+                            help='submit_answers calls per student before submitting')
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='Students taking the exam at the same time')
+        parser.add_argument('--profiles', nargs='+', choices=PROFILES,
+                            help='Run once per DB_PROFILE in a fresh process and compare')
+
+    def handle(self, *args, **options):
+        if options['profiles']:
+            self._run_profiles(options['profiles'], options)
+            return
+
+        professor, students, exam, questions = self._create_exam(options)
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                runs = list(pool.map(
+                    lambda student: self._take_exam(student, exam, questions, options['autosaves']),
+                    students
+                ))
+            elapsed = time.perf_counter() - started
+        finally:
+            # Cascades to the exam, attempts, answers and grading jobs
+            User.objects.filter(pk__in=[professor.pk] + [student.pk for student in students]).delete()
+
+        self._report(runs, elapsed)
+
+    def _run_profiles(self, profiles, options):
+        args = [
+            'bench_submit_workload',
+            '--students', str(options['students']),
+            '--questions', str(options['questions']),
+            '--autosaves', str(options['autosaves']),
+            '--concurrency', str(options['concurrency']),
+        ]
+        for profile in profiles:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'DB_PROFILE={profile}'))
+            self.stdout.flush()
+            result = subprocess.run([sys.executable, '-m', 'django', *args], cwd=settings.BASE_DIR,
+                                    env=dict(os.environ, DB_PROFILE=profile))
+            if result.returncode:
+                raise CommandError(f'Benchmark failed for profile {profile}')
+
+    def _create_exam(self, options):
+        tag = uuid.uuid4().hex[:8]
+        professor = User.objects.create(username=f'bench_{tag}_professor', role='professor')
+        students = User.objects.bulk_create([
+            User(username=f'bench_{tag}_student_{i}', role='student')
+            for i in range(options['students'])
+        ])
+        exam = Exam.objects.create(title='Submit benchmark', professor=professor,
+                                   duration_minutes=60, is_published=True)
+        questions = Question.objects.bulk_create([
+            Question(exam=exam, question_type='single_choice', question_text=f'Question {i}',
+                     marks=1, order=i + 1)
+            for i in range(options['questions'])
+        ])
+        choices = Choice.objects.bulk_create([
+            Choice(question=question, choice_text=f'Choice {j}', is_correct=(j == 0))
+            for question in questions
+            for j in range(4)
+        ])
+        choice_ids = {}
+        for choice in choices:
+            choice_ids.setdefault(choice.question_id, []).append(choice.pk)
+        exam.refresh_from_db()
+        return professor, students, exam, choice_ids
+
+    def _call(self, action, user, path, data, pk=None):
+        """Call a StudentExamViewSet action the way a request would reach it"""
+        request = APIRequestFactory().post(path, data, format='json')
+        force_authenticate(request, user=user)
+        view = StudentExamViewSet.as_view({'post': action})
+        close_old_connections()
+        started = time.perf_counter()
+        try:
+            response = view(request, pk=pk) if pk is not None else view(request)
+            response.render()
+        finally:
+            close_old_connections()
+        return time.perf_counter() - started, response
+
+    def _take_exam(self, student, exam, choice_ids, autosaves):
+        timings = {step: [] for step in STEPS}
+        errors = 0
+        try:
+            elapsed, response = self._call('start_exam', student, '/api/student-exams/start_exam/',
+                                           {'exam_id': exam.pk})
+            timings['start_exam'].append(elapsed)
+            if response.status_code != 200:
+                return timings, 1
+            student_exam_id = response.data['id']
+
+            question_ids = list(choice_ids)
+            batch = max(1, -(-len(question_ids) // max(1, autosaves)))
+            for offset in range(0, len(question_ids), batch):
+                answers = [
+                    {'question_id': question_id, 'selected_choices': [choice_ids[question_id][offset % 4]]}
+                    for question_id in question_ids[offset:offset + batch]
+                ]
+                elapsed, response = self._call('submit_answers', student,
+                                               f'/api/student-exams/{student_exam_id}/submit_answers/',
+                                               {'answers': answers}, pk=student_exam_id)
+                timings['submit_answers'].append(elapsed)
+                errors += response.status_code != 200
+
+            elapsed, response = self._call('submit_exam', student,
+                                           f'/api/student-exams/{student_exam_id}/submit_exam/',
+                                           {}, pk=student_exam_id)
+            timings['submit_exam'].append(elapsed)
+            errors += response.status_code != 200
+        except Exception as exc:
+            self.stderr.write(f'{student.username}: {exc}')
+            errors += 1
+        finally:
+            connection.close()
+        return timings, errors
+
+    def _describe_database(self):
+        database = settings.DATABASES['default']
+        details = [f"profile={getattr(settings, 'DATABASE_PROFILE', '?')}", f'vendor={connection.vendor}',
+                   f"conn_max_age={database.get('CONN_MAX_AGE', 0)}",
+                   f"grading={'background' if getattr(settings, 'EXAMS_GRADE_IN_BACKGROUND', True) else 'inline'}"]
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                for name in SQLITE_PRAGMAS:
+                    cursor.execute(f'PRAGMA {name}')
+                    details.append(f'{name}={cursor.fetchone()[0]}')
+        elif 'pool' in database.get('OPTIONS', {}):
+            details.append(f"pool={database['OPTIONS']['pool']}")
+        return ', '.join(details)
+
+    def _report(self, runs, elapsed):
+        timings = {step: [value for run, _ in runs for value in run[step]] for step in STEPS}
+        errors = sum(error_count for _, error_count in runs)
+        requests = sum(len(values) for values in timings.values())
+
+        self.stdout.write(self._describe_database())
+        self.stdout.write(f"{len(runs)} students, {requests} requests in {elapsed:.2f}s "
+                          f"({requests / elapsed:,.0f} requests/s)")
+        for step, values in timings.items():
+            if not values:
+                continue
+            self.stdout.write(
+                f'  {step:<15} n={len(values):<6} '
+                f'p50={statistics.median(values) * 1000:8.1f}ms '
+                f'p95={_percentile(values, 0.95) * 1000:8.1f}ms '
+                f'max={max(values) * 1000:8.1f}ms'
+            )
+        if errors:
+            self.stdout.write(self.style.ERROR(f'{errors} failed requests'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No failed requests'))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from exams.answer_buffer import flush_all
+
+
+class Command(BaseCommand):
+    help = 'Write buffered answer autosaves to the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Keep running and flush every N seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            written = flush_all()
+            self.stdout.write(f'Flushed {written} buffered answers')
+            if not options['interval']:
+                break
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                break
@@ -0,0 +1,73 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import timedelta
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from exams.jobs import claim_jobs, run_job, release_stale_jobs
+
+
+def _run_job_in_thread(job_id):
+    try:
+        return run_job(job_id)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Drain the grading queue, grading submitted attempts in a worker pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Number of pool workers (default: 4)')
+        parser.add_argument('--mode', choices=['thread', 'process'], default='thread',
+                            help='Run jobs in a thread pool or a process pool')
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Jobs claimed per poll')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--stale-after', type=int, default=300,
+                            help='Requeue jobs left running for this many seconds')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        worker_token = uuid.uuid4().hex
+        stale_after = timedelta(seconds=options['stale_after'])
+
+        if options['mode'] == 'process':
+            # Children must open their own connections rather than inherit ours
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup)
+            task = run_job
+        else:
+            pool = ThreadPoolExecutor(max_workers=options['workers'])
+            task = _run_job_in_thread
+
+        self.stdout.write(f"Grading worker {worker_token[:8]} started "
+                          f"({options['workers']} {options['mode']} workers)")
+        graded = failed = 0
+        try:
+            with pool:
+                while True:
+                    release_stale_jobs(timezone.now() - stale_after)
+                    job_ids = claim_jobs(options['batch_size'], worker_token)
+                    if not job_ids:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+
+                    for result in pool.map(task, job_ids):
+                        if result == 'done':
+                            graded += 1
+                        else:
+                            failed += 1
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping grading worker')
+
+        self.stdout.write(self.style.SUCCESS(f'Graded {graded} attempts ({failed} failed or retried)'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from exams.models import Exam
+from exams.question_bank import FORMATS, QuestionBankError, import_questions
+
+
+class Command(BaseCommand):
+    help = 'Append questions from an NDJSON or CSV question bank to an exam'
+
+    def add_arguments(self, parser):
+        parser.add_argument('exam_id', type=int)
+        parser.add_argument('path')
+        parser.add_argument('--format', dest='file_format', choices=FORMATS,
+                            help='File format (default: from the file extension)')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Questions inserted per bulk_create')
+
+    def handle(self, *args, **options):
+        try:
+            exam = Exam.objects.get(pk=options['exam_id'])
+        except Exam.DoesNotExist:
+            raise CommandError(f"Exam {options['exam_id']} does not exist")
+
+        file_format = options['file_format'] or ('csv' if options['path'].lower().endswith('.csv') else 'ndjson')
+        try:
+            with open(options['path'], 'rb') as stream:
+                imported = import_questions(exam, stream, file_format, options['chunk_size'])
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except QuestionBankError as exc:
+            for error in exc.errors:
+                self.stderr.write(f"line {error['line']}: {error['errors']}")
+            raise CommandError('Import failed; no questions were saved')
+
+        self.stdout.write(self.style.SUCCESS(f'Imported {imported} questions into "{exam.title}"'))
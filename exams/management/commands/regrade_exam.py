@@ -0,0 +1,105 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from exams.answer_key import get_answer_key
+from exams.grading import (
+    load_selections, load_current_marks, score_selections, diff_regrade, write_regrade
+)
+from exams.models import Exam, StudentExam
+
+
+_pool_answer_key = None
+
+
+def _init_pool(answer_key):
+    global _pool_answer_key
+    django.setup()
+    _pool_answer_key = answer_key
+
+
+def _score_batch(selections):
+    marks, _ = score_selections(_pool_answer_key, selections)
+    return marks
+
+
+def _split(items, parts):
+    items = list(items)
+    size = max(1, -(-len(items) // parts))
+    return [dict(items[i:i + size]) for i in range(0, len(items), size)]
+
+
+class Command(BaseCommand):
+    help = 'Re-score every graded attempt of an exam against its current answer key'
+
+    def add_arguments(self, parser):
+        parser.add_argument('exam_id', type=int)
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Scoring processes; 1 scores in this process (default: 4)')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Attempts loaded and written per chunk')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report what would change without writing')
+
+    def handle(self, *args, **options):
+        try:
+            exam = Exam.objects.get(pk=options['exam_id'])
+        except Exam.DoesNotExist:
+            raise CommandError(f"Exam {options['exam_id']} does not exist")
+
+        started = time.monotonic()
+        answer_key = get_answer_key(exam.pk, exam.version)
+        attempts = StudentExam.objects.filter(exam=exam, status='graded').order_by('id')
+
+        pool = None
+        if options['workers'] > 1:
+            connections.close_all()
+            pool = ProcessPoolExecutor(
+                max_workers=options['workers'],
+                initializer=_init_pool,
+                initargs=(answer_key,)
+            )
+
+        attempt_count = marks_changed = scores_changed = 0
+        last_id = 0
+        try:
+            while True:
+                current_scores = dict(
+                    attempts.filter(id__gt=last_id).values_list('id', 'score')[:options['chunk_size']]
+                )
+                if not current_scores:
+                    break
+                last_id = max(current_scores)
+                attempt_ids = list(current_scores)
+
+                selections = load_selections(attempt_ids, answer_key)
+                current_marks = load_current_marks(attempt_ids)
+                if pool:
+                    new_marks = {}
+                    for marks in pool.map(_score_batch, _split(selections.items(), options['workers'])):
+                        new_marks.update(marks)
+                else:
+                    new_marks, _ = score_selections(answer_key, selections)
+
+                changed_marks, changed_scores = diff_regrade(
+                    selections, current_marks, new_marks, current_scores
+                )
+                if not options['dry_run']:
+                    write_regrade(changed_marks, changed_scores)
+
+                attempt_count += len(attempt_ids)
+                marks_changed += len(changed_marks)
+                scores_changed += len(changed_scores)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        elapsed = time.monotonic() - started
+        prefix = '[dry run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Regraded {attempt_count} attempts of "{exam.title}" in {elapsed:.2f}s: '
+            f'{scores_changed} scores and {marks_changed} answer marks changed'
+        ))
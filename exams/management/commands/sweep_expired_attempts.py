@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from exams.deadlines import sweep_expired_attempts
+
+
+class Command(BaseCommand):
+    help = 'Submit and queue for grading every attempt whose deadline has passed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Attempts submitted per transaction')
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Keep running and sweep every N seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            swept = sweep_expired_attempts(batch_size=options['batch_size'])
+            self.stdout.write(f'Submitted {swept} expired attempts')
+            if not options['interval']:
+                break
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                break
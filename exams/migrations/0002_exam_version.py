@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("exams", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="exam",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1,
+                editable=False,
+                help_text="Bumped whenever a question or choice changes",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("exams", "0003_gradingjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="answer",
+            name="choice_mask",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
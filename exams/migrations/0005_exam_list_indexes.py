@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("exams", "0004_answer_choice_mask"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="exam",
+            index=models.Index(
+                fields=["professor", "-created_at", "id"],
+                name="exams_exam_profess_9633cc_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="exam",
+            index=models.Index(
+                fields=["is_published", "-created_at", "id"],
+                name="exams_exam_is_publ_af7fd6_idx",
+            ),
+        ),
+    ]
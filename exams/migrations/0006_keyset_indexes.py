@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("exams", "0005_exam_list_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="studentexam",
+            index=models.Index(
+                fields=["student", "-started_at", "id"],
+                name="exams_stude_student_3d4834_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentexam",
+            index=models.Index(
+                fields=["exam", "-started_at", "id"],
+                name="exams_stude_exam_id_45a213_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("exams", "0006_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="studentexam",
+            name="graded_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
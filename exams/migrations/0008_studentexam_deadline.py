@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:18
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_deadlines(apps, schema_editor):
+    StudentExam = apps.get_model("exams", "StudentExam")
+    attempts = StudentExam.objects.filter(started_at__isnull=False).select_related("exam")
+    batch = []
+    for attempt in attempts.iterator(chunk_size=1000):
+        attempt.deadline = attempt.started_at + timedelta(minutes=attempt.exam.duration_minutes)
+        batch.append(attempt)
+        if len(batch) >= 1000:
+            StudentExam.objects.bulk_update(batch, ["deadline"])
+            batch = []
+    StudentExam.objects.bulk_update(batch, ["deadline"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("exams", "0007_studentexam_graded_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="studentexam",
+            name="deadline",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_deadlines, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="studentexam",
+            index=models.Index(
+                fields=["status", "deadline"], name="exams_stude_status_ea34c5_idx"
+            ),
+        ),
+    ]
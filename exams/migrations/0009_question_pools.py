@@ -0,0 +1,91 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("exams", "0008_studentexam_deadline"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuestionPoolRule",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tag",
+                    models.CharField(
+                        blank=True, help_text="Empty matches any tag", max_length=50
+                    ),
+                ),
+                (
+                    "question_type",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("multiple_choice", "Multiple Choice"),
+                            ("single_choice", "Single Choice"),
+                            ("true_false", "True/False"),
+                            ("long_answer", "Long Answer"),
+                        ],
+                        help_text="Empty matches any type",
+                        max_length=20,
+                    ),
+                ),
+                ("count", models.PositiveIntegerField()),
+                ("order", models.IntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["order", "id"],
+            },
+        ),
+        migrations.AddField(
+            model_name="question",
+            name="tag",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Topic or section used by pool rules",
+                max_length=50,
+            ),
+        ),
+        migrations.AddField(
+            model_name="studentexam",
+            name="seed",
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="studentexam",
+            name="total_marks",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, editable=False, max_digits=6, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="question",
+            index=models.Index(
+                fields=["exam", "tag", "question_type"],
+                name="exams_quest_exam_id_911a4f_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="questionpoolrule",
+            name="exam",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="pool_rules",
+                to="exams.exam",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("exams", "0009_question_pools"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="studentexam",
+            name="question_ids",
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
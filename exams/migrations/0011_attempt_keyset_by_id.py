@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("exams", "0010_studentexam_question_ids"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="studentexam",
+            name="exams_stude_student_3d4834_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="studentexam",
+            name="exams_stude_exam_id_45a213_idx",
+        ),
+        migrations.AddIndex(
+            model_name="studentexam",
+            index=models.Index(
+                fields=["student", "-id"], name="exams_stude_student_9db76c_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentexam",
+            index=models.Index(
+                fields=["exam", "-id"], name="exams_stude_exam_id_3d47c9_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("exams", "0011_attempt_keyset_by_id"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="studentexam",
+            name="buffered_since",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="studentexam",
+            index=models.Index(
+                fields=["buffered_since"], name="exams_stude_buffere_9bb0d7_idx"
+            ),
+        ),
+    ]
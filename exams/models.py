@@ -9,6 +9,8 @@ class Exam(models.Model):
     duration_minutes = models.IntegerField(help_text="Exam duration in minutes")
     total_marks = models.DecimalField(max_digits=6, decimal_places=2, default=0)
     is_published = models.BooleanField(default=False)
+    version = models.PositiveIntegerField(default=1, editable=False,
+                                          help_text="Bumped whenever a question or choice changes")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -17,6 +19,10 @@ class Exam(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['professor', '-created_at', 'id']),
+            models.Index(fields=['is_published', '-created_at', 'id']),
+        ]
 
 
 class Question(models.Model):
@@ -32,12 +38,33 @@ class Question(models.Model):
     question_text = models.TextField()
     marks = models.DecimalField(max_digits=5, decimal_places=2)
     order = models.IntegerField(default=0)
+    tag = models.CharField(max_length=50, blank=True, default='',
+                           help_text="Topic or section used by pool rules")
     
     def __str__(self):
         return f"{self.exam.title} - Q{self.order}"
     
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['exam', 'tag', 'question_type']),
+        ]
+
+
+class QuestionPoolRule(models.Model):
+    """Draw ``count`` questions matching a tag and/or type into every attempt"""
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='pool_rules')
+    tag = models.CharField(max_length=50, blank=True, help_text="Empty matches any tag")
+    question_type = models.CharField(max_length=20, choices=Question.QUESTION_TYPES, blank=True,
+                                     help_text="Empty matches any type")
+    count = models.PositiveIntegerField()
+    order = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.exam.title} - {self.count} x {self.tag or '*'}/{self.question_type or '*'}"
+    
+    class Meta:
+        ordering = ['order', 'id']
 
 
 class Choice(models.Model):
@@ -62,11 +89,31 @@ class StudentExam(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='not_started')
     started_at = models.DateTimeField(null=True, blank=True)
     submitted_at = models.DateTimeField(null=True, blank=True)
+    # started_at + exam duration; open attempts past it are submitted by
+    # sweep_expired_attempts (see exams.deadlines)
+    deadline = models.DateTimeField(null=True, blank=True, editable=False)
     score = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    # Seeds the attempt's question draw and order when the exam has pool
+    # rules (see exams.pools); question_ids keeps the drawn questions in
+    # order, and total_marks their marks (null means the exam's total_marks)
+    seed = models.BigIntegerField(null=True, blank=True, editable=False)
+    question_ids = models.JSONField(null=True, blank=True, editable=False)
+    total_marks = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, editable=False)
+    # Last time any mark of this attempt was written by grading
+    graded_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Set while the attempt has answers in the write-behind buffer
+    # (see exams.answer_buffer)
+    buffered_since = models.DateTimeField(null=True, blank=True, editable=False)
     
     class Meta:
         unique_together = ['student', 'exam']
         ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['student', '-id']),
+            models.Index(fields=['exam', '-id']),
+            models.Index(fields=['status', 'deadline']),
+            models.Index(fields=['buffered_since']),
+        ]
     
     def __str__(self):
         return f"{self.student.username} - {self.exam.title}"
@@ -76,6 +123,9 @@ class Answer(models.Model):
     student_exam = models.ForeignKey(StudentExam, on_delete=models.CASCADE, related_name='answers')
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     selected_choices = models.ManyToManyField(Choice, blank=True)
+    # Selected choices as bits over the question's choices ordered by id
+    # (see exams.answer_key.choice_bits); kept in sync with selected_choices
+    choice_mask = models.BigIntegerField(null=True, blank=True)
     text_answer = models.TextField(blank=True)
     marks_obtained = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     
@@ -84,3 +134,31 @@ class Answer(models.Model):
     
     def __str__(self):
         return f"{self.student_exam.student.username} - {self.question}"
+
+
+class GradingJob(models.Model):
+    """Queued auto-grading work for a submitted attempt, drained by grade_worker"""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    student_exam = models.ForeignKey(StudentExam, on_delete=models.CASCADE, related_name='grading_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    claimed_by = models.CharField(max_length=64, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.student_exam} ({self.status})"
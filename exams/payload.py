@@ -0,0 +1,139 @@
+"""
+Pre-rendered exam payloads.
+
+The body of GET /api/exams/<id>/ only depends on the exam, its questions and
+the viewer's role, so it is rendered to JSON bytes once per exam version and
+role and kept in the cache together with a strong ETag. Publishing or
+editing the exam changes updated_at, and question/choice changes bump
+Exam.version, so either moves readers on to a fresh entry. Students of an
+exam with pool rules get only the questions drawn for their attempt, cached
+per attempt seed (see exams.pools).
+
+start_exam can also answer with the attempt payload: the attempt state, the
+server clock and the saved answers followed by the cached exam body, spliced
+in as bytes, so starting or resuming an exam is one request with a fixed
+number of queries.
+"""
+import hashlib
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch, prefetch_related_objects
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from . import answer_buffer
+from .answer_key import get_answer_key
+from .models import Question, StudentExam, Answer
+from .pools import get_pool, attempt_seed, attempt_questions, shuffle_choices
+from .serializers import exam_serializer_for, AttemptStateSerializer
+
+
+CACHE_TIMEOUT = getattr(settings, 'EXAMS_PAYLOAD_CACHE_TIMEOUT', 60 * 60)
+
+
+def _cache_key(exam, role):
+    return f'exams:payload:{exam.pk}:{exam.version}:{exam.updated_at.timestamp()}:{role}'
+
+
+def render_exam_payload(exam, request, question_ids=None, seed=None):
+    """
+    Serialize an exam with its questions for the requesting user's role.
+    With question_ids only those questions are included, in that order and
+    with their choices shuffled by seed.
+    """
+    serializer_class = exam_serializer_for(request.user.role)
+    if question_ids is None:
+        prefetch_related_objects([exam], 'pool_rules', 'questions__choices')
+        data = serializer_class(exam, context={'request': request}).data
+        return JSONRenderer().render(data)
+
+    prefetch_related_objects([exam], Prefetch(
+        'questions', queryset=Question.objects.filter(id__in=question_ids).prefetch_related('choices')
+    ))
+    data = serializer_class(exam, context={'request': request}).data
+    questions = {question['id']: question for question in data['questions']}
+    data['questions'] = [
+        shuffle_choices(seed, {**questions[question_id], 'order': position})
+        for position, question_id in enumerate(question_ids, start=1)
+        if question_id in questions
+    ]
+    data['total_marks'] = str(sum(
+        (Decimal(question['marks']) for question in data['questions']), Decimal(0)
+    ).quantize(Decimal('0.01')))
+    return JSONRenderer().render(data)
+
+
+def get_exam_payload(exam, request, student_exam=None):
+    """Return (etag, body) for an exam, rendering it on a cache miss"""
+    key = _cache_key(exam, request.user.role)
+    pooled = request.user.role == 'student' and (
+        bool(get_pool(exam.pk, exam.version))
+        or (student_exam is not None and student_exam.question_ids is not None)
+    )
+    if pooled:
+        # Students only see the questions drawn for their own attempt
+        if student_exam is None:
+            student_exam = StudentExam.objects.filter(exam=exam, student=request.user).only(
+                'id', 'seed', 'question_ids'
+            ).first()
+        key = f'{key}:{attempt_seed(student_exam) if student_exam else "unstarted"}'
+
+    payload = cache.get(key)
+    if payload is None:
+        if not pooled:
+            body = render_exam_payload(exam, request)
+        elif student_exam is None:
+            body = render_exam_payload(exam, request, question_ids=[])
+        else:
+            body = render_exam_payload(exam, request, attempt_questions(exam, student_exam),
+                                       attempt_seed(student_exam))
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+        payload = (etag, body)
+        cache.set(key, payload, CACHE_TIMEOUT)
+    return payload
+
+
+def saved_answers(student_exam, answer_key):
+    """
+    {question_id: [choice_ids] | text} for an attempt in one query, including
+    answers still waiting in the write-behind buffer
+    """
+    answers = {}
+    rows = Answer.objects.filter(student_exam=student_exam).values_list(
+        'question_id', 'text_answer', 'selected_choices'
+    )
+    for question_id, text_answer, choice_id in rows:
+        if question_id in answer_key:
+            answers.setdefault(question_id, [])
+            if choice_id is not None:
+                answers[question_id].append(choice_id)
+        else:
+            answers[question_id] = text_answer
+
+    if student_exam.status == 'in_progress' and answer_buffer.is_enabled():
+        for question_id, entry in answer_buffer.buffered_answers(student_exam).items():
+            if question_id in answer_key:
+                answers[question_id] = list(entry['selected_choices'])
+            else:
+                answers[question_id] = entry['text_answer']
+
+    return {question_id: sorted(value) if isinstance(value, list) else value
+            for question_id, value in answers.items()}
+
+
+def render_attempt_payload(student_exam, exam, request):
+    """Attempt state, server time and saved answers, followed by the cached exam body"""
+    _, exam_body = get_exam_payload(exam, request, student_exam)
+    data = dict(AttemptStateSerializer(student_exam).data)
+    data['server_time'] = timezone.now()
+    data['answers'] = saved_answers(student_exam, get_answer_key(exam.pk, exam.version))
+    body = JSONRenderer().render(data)
+    return body[:-1] + b',"exam":' + exam_body + b'}'
+
+
+def etag_matches(request, etag):
+    """True when the client's If-None-Match already names this ETag"""
+    if_none_match = request.headers.get('If-None-Match', '')
+    return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
@@ -0,0 +1,121 @@
+"""
+Question pools.
+
+An exam with QuestionPoolRule rows gives every attempt its own subset and
+order of questions, drawn from StudentExam.seed when the attempt starts:
+
+* each rule's candidates (question ids matching its tag and type) are read
+  from the (exam, tag, question_type) index and cached per exam version, so
+  a large pool is never loaded as model instances;
+* a rule samples ``count`` positions of its candidate list, and the drawn
+  questions are shuffled by the seed;
+* the ordered ids are stored in StudentExam.question_ids, so later edits to
+  the pool never change an attempt that has already started. Choices of
+  choice questions are shuffled by the seed when the payload is rendered.
+
+Grading works on question and choice ids, so it is unaffected by the order;
+answer writes are checked against the attempt's draw, and the attempt's
+possible marks are stored in StudentExam.total_marks when it starts.
+"""
+import random
+import secrets
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+
+from .models import Question, QuestionPoolRule, StudentExam
+
+
+CACHE_TIMEOUT = getattr(settings, 'EXAMS_POOL_CACHE_TIMEOUT', 60 * 60 * 24)
+SHUFFLED_CHOICE_TYPES = ('single_choice', 'multiple_choice')
+
+
+def new_seed():
+    return secrets.randbits(62)
+
+
+def attempt_seed(student_exam):
+    """The attempt's seed; attempts started before pools existed use their id"""
+    return student_exam.pk if student_exam.seed is None else student_exam.seed
+
+
+def _pool_key(exam_id, version):
+    return f'exams:pool:{exam_id}:{version}'
+
+
+def load_pool(exam_id):
+    """[(count, candidate_ids)] for each of the exam's rules, in rule order"""
+    pool = []
+    for tag, question_type, count in QuestionPoolRule.objects.filter(exam_id=exam_id).values_list(
+        'tag', 'question_type', 'count'
+    ):
+        candidates = Question.objects.filter(exam_id=exam_id)
+        if tag:
+            candidates = candidates.filter(tag=tag)
+        if question_type:
+            candidates = candidates.filter(question_type=question_type)
+        pool.append((count, tuple(candidates.values_list('id', flat=True))))
+    return pool
+
+
+def get_pool(exam_id, version):
+    """The exam's pool, cached per version; empty when the exam has no rules"""
+    pool = cache.get(_pool_key(exam_id, version))
+    if pool is None:
+        pool = load_pool(exam_id)
+        cache.set(_pool_key(exam_id, version), pool, CACHE_TIMEOUT)
+    return pool
+
+
+def draw_questions(pool, seed):
+    """Question ids drawn from a pool for a seed, in the attempt's order"""
+    rng = random.Random(seed)
+    drawn = []
+    taken = set()
+    for count, candidates in pool:
+        available = [question_id for question_id in candidates if question_id not in taken]
+        picked = rng.sample(available, min(count, len(available)))
+        drawn.extend(picked)
+        taken.update(picked)
+    rng.shuffle(drawn)
+    return drawn
+
+
+def draw_for_attempt(exam, student_exam):
+    """Draw an attempt's questions from the current pool, or None without pool rules"""
+    pool = get_pool(exam.pk, exam.version)
+    if not pool:
+        return None
+    return draw_questions(pool, attempt_seed(student_exam))
+
+
+def attempt_questions(exam, student_exam):
+    """
+    Ordered question ids of an attempt, or None when every attempt gets all
+    of the exam's questions.
+    """
+    if student_exam.question_ids is not None:
+        return student_exam.question_ids
+
+    # Attempts started before draws were stored: draw once and keep it
+    drawn = draw_for_attempt(exam, student_exam)
+    if drawn is not None:
+        StudentExam.objects.filter(pk=student_exam.pk, question_ids__isnull=True).update(question_ids=drawn)
+        student_exam.question_ids = drawn
+    return drawn
+
+
+def shuffle_choices(seed, question_data):
+    """Reorder a serialized question's choices for an attempt"""
+    if question_data['question_type'] in SHUFFLED_CHOICE_TYPES:
+        random.Random(f'{seed}:{question_data["id"]}').shuffle(question_data['choices'])
+    return question_data
+
+
+def drawn_total_marks(question_ids):
+    return Question.objects.filter(id__in=question_ids).aggregate(
+        total=Coalesce(Sum('marks'), Decimal(0))
+    )['total']
@@ -0,0 +1,190 @@
+"""
+Streaming question-bank import and export.
+
+Two formats are supported:
+
+* ``ndjson``: one JSON object per line,
+  {"question_type", "question_text", "marks", "tag", "choices": [{"choice_text", "is_correct"}]}
+* ``csv``: one row per choice with the columns in CSV_COLUMNS; consecutive
+  rows sharing a ``question_no`` form one question, and long answers use a
+  single row with an empty ``choice_text``.
+
+Exports walk the exam in chunks and yield text as it is produced. Imports
+parse the file incrementally, validate every question and bulk_create them
+in chunks inside one transaction, so a large bank is never held in memory
+as a whole.
+"""
+import csv
+import io
+import itertools
+import json
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max
+
+from .models import Exam, Question, Choice
+from .serializers import QuestionSerializer
+from .signals import bump_exam_version
+from .streaming import UTF8_BOM, Echo, iter_chunks
+
+
+FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv; charset=utf-8'}
+CSV_COLUMNS = ['question_no', 'question_type', 'question_text', 'marks', 'choice_text', 'is_correct', 'tag']
+MAX_REPORTED_ERRORS = 50
+
+
+class QuestionBankError(Exception):
+    """Raised when an import contains invalid questions; nothing is saved"""
+
+    def __init__(self, errors):
+        super().__init__(f'{len(errors)} invalid questions')
+        self.errors = errors
+
+
+def _iter_questions(exam, chunk_size):
+    """Yield (question, [choices]) for an exam, loading choices per chunk"""
+    questions = Question.objects.filter(exam=exam).order_by('order', 'id').iterator(chunk_size=chunk_size)
+    for chunk in iter_chunks(questions, chunk_size):
+        choices = {}
+        for choice in Choice.objects.filter(question__in=chunk).order_by('id'):
+            choices.setdefault(choice.question_id, []).append(choice)
+        for question in chunk:
+            yield question, choices.get(question.id, [])
+
+
+def export_questions(exam, file_format, chunk_size=500):
+    """Yield the exam's questions as NDJSON lines or CSV rows"""
+    if file_format == 'csv':
+        writer = csv.writer(Echo())
+        yield UTF8_BOM + writer.writerow(CSV_COLUMNS)
+        for number, (question, choices) in enumerate(_iter_questions(exam, chunk_size), start=1):
+            rows = [(choice.choice_text, 'true' if choice.is_correct else 'false') for choice in choices] or [('', '')]
+            yield ''.join(
+                writer.writerow([number, question.question_type, question.question_text,
+                                 question.marks, choice_text, is_correct, question.tag])
+                for choice_text, is_correct in rows
+            )
+        return
+
+    for question, choices in _iter_questions(exam, chunk_size):
+        yield json.dumps({
+            'question_type': question.question_type,
+            'question_text': question.question_text,
+            'marks': str(question.marks),
+            'tag': question.tag,
+            'choices': [
+                {'choice_text': choice.choice_text, 'is_correct': choice.is_correct}
+                for choice in choices
+            ],
+        }, ensure_ascii=False) + '\n'
+
+
+def _parse_ndjson(lines):
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, exc
+
+
+def _parse_csv(lines):
+    reader = csv.DictReader(lines)
+    # groupby reads one row past each group, so keep every row's own line number
+    numbered = ((reader.line_num, row) for row in reader)
+    for question_no, rows in itertools.groupby(numbered, key=lambda item: item[1].get('question_no')):
+        line_no, first = next(rows)
+        rows = [first] + [row for _, row in rows]
+        choices = [
+            {'choice_text': row['choice_text'],
+             'is_correct': (row.get('is_correct') or '').strip().lower() in ('true', '1', 'yes')}
+            for row in rows if row.get('choice_text')
+        ]
+        yield line_no, {
+            'question_type': first.get('question_type'),
+            'question_text': first.get('question_text'),
+            'marks': first.get('marks'),
+            'tag': first.get('tag') or '',
+            'choices': choices,
+        }
+
+
+def parse_questions(stream, file_format):
+    """Yield (line_no, data) for each question in a binary file stream"""
+    lines = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if file_format == 'csv':
+        return _parse_csv(lines)
+    return _parse_ndjson(lines)
+
+
+def _insert_chunk(exam, validated, next_order):
+    questions = Question.objects.bulk_create([
+        Question(exam=exam, order=next_order + idx,
+                 **{key: value for key, value in data.items() if key not in ('choices', 'order')})
+        for idx, data in enumerate(validated)
+    ])
+    Choice.objects.bulk_create([
+        Choice(question=question, **choice_data)
+        for question, data in zip(questions, validated)
+        for choice_data in data.get('choices', [])
+    ])
+
+
+def import_questions(exam, stream, file_format, chunk_size=500):
+    """
+    Append questions from a file stream to an exam. Questions are validated
+    as they are read and inserted chunk by chunk; if any question is
+    invalid the whole import is rolled back and QuestionBankError lists the
+    problems. Returns the number of questions imported.
+    """
+    errors = []
+    imported = 0
+    added_marks = Decimal(0)
+
+    with transaction.atomic():
+        exam = Exam.objects.select_for_update().get(pk=exam.pk)
+        next_order = (Question.objects.filter(exam=exam).aggregate(max_order=Max('order'))['max_order'] or 0) + 1
+
+        chunk = []
+        for line_no, data in parse_questions(stream, file_format):
+            if isinstance(data, Exception):
+                errors.append({'line': line_no, 'errors': str(data)})
+            else:
+                serializer = QuestionSerializer(data=data)
+                if serializer.is_valid():
+                    chunk.append(serializer.validated_data)
+                else:
+                    errors.append({'line': line_no, 'errors': serializer.errors})
+            if len(errors) >= MAX_REPORTED_ERRORS:
+                break
+
+            if errors:
+                # Keep validating to report problems, but stop buffering rows
+                chunk = []
+            elif len(chunk) >= chunk_size:
+                _insert_chunk(exam, chunk, next_order + imported)
+                imported += len(chunk)
+                added_marks += sum(item['marks'] for item in chunk)
+                chunk = []
+
+        if errors:
+            raise QuestionBankError(errors)
+
+        if chunk:
+            _insert_chunk(exam, chunk, next_order + imported)
+            imported += len(chunk)
+            added_marks += sum(item['marks'] for item in chunk)
+
+        exam.total_marks += added_marks
+        field = Exam._meta.get_field('total_marks')
+        if exam.total_marks >= Decimal(10) ** (field.max_digits - field.decimal_places):
+            raise QuestionBankError([{'line': None, 'errors': 'Exam total marks would exceed the allowed maximum'}])
+        exam.save(update_fields=['total_marks', 'updated_at'])
+        # bulk_create sends no signals, so move the exam to a new version here
+        bump_exam_version(exam.pk)
+
+    return imported
@@ -1,21 +1,25 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
-from .models import Exam, Question, Choice, StudentExam, Answer
+from . import answer_buffer
+from .models import Exam, Question, QuestionPoolRule, Choice, StudentExam, Answer
 
 
 class ChoiceSerializer(serializers.ModelSerializer):
+    """Professor view of a choice, including is_correct"""
     class Meta:
         model = Choice
         fields = ['id', 'choice_text', 'is_correct']
-        
-    def to_representation(self, instance):
-        """Show is_correct only to professors"""
-        data = super().to_representation(instance)
-        request = self.context.get('request')
-        if request and hasattr(request, 'user'):
-            # Hide is_correct from students
-            if request.user.role == 'student':
-                data.pop('is_correct', None)
-        return data
+
+
+class PublicChoiceSerializer(serializers.ModelSerializer):
+    """Student view of a choice; never exposes is_correct"""
+    class Meta:
+        model = Choice
+        fields = ['id', 'choice_text']
+        read_only_fields = fields
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -23,7 +27,7 @@ class QuestionSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Question
-        fields = ['id', 'question_type', 'question_text', 'marks', 'order', 'choices']
+        fields = ['id', 'question_type', 'question_text', 'marks', 'order', 'tag', 'choices']
     
     def create(self, validated_data):
         choices_data = validated_data.pop('choices', [])
@@ -35,46 +39,112 @@ class QuestionSerializer(serializers.ModelSerializer):
         return question
 
 
+class QuestionPoolRuleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuestionPoolRule
+        fields = ['tag', 'question_type', 'count']
+    
+    def validate_count(self, value):
+        if value < 1:
+            raise serializers.ValidationError('Must draw at least one question')
+        return value
+
+
 class ExamSerializer(serializers.ModelSerializer):
     questions = QuestionSerializer(many=True, read_only=True)
+    pool_rules = QuestionPoolRuleSerializer(many=True, read_only=True)
     professor_name = serializers.CharField(source='professor.username', read_only=True)
     
     class Meta:
         model = Exam
         fields = ['id', 'title', 'description', 'professor', 'professor_name', 
                   'duration_minutes', 'total_marks', 'is_published', 
-                  'created_at', 'updated_at', 'questions']
+                  'created_at', 'updated_at', 'pool_rules', 'questions']
         read_only_fields = ['professor', 'created_at', 'updated_at']
 
 
+class PublicQuestionSerializer(serializers.ModelSerializer):
+    choices = PublicChoiceSerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = Question
+        fields = ['id', 'question_type', 'question_text', 'marks', 'order', 'tag', 'choices']
+        read_only_fields = fields
+
+
+class PublicExamSerializer(serializers.ModelSerializer):
+    """Student view of an exam and its questions"""
+    questions = PublicQuestionSerializer(many=True, read_only=True)
+    professor_name = serializers.CharField(source='professor.username', read_only=True)
+    
+    class Meta:
+        model = Exam
+        fields = ['id', 'title', 'description', 'professor', 'professor_name', 
+                  'duration_minutes', 'total_marks', 'is_published', 
+                  'created_at', 'updated_at', 'questions']
+        read_only_fields = fields
+
+
+def exam_serializer_for(role):
+    """Pick the exam serializer for a viewer's role once per request"""
+    return PublicExamSerializer if role == 'student' else ExamSerializer
+
+
+class ExamSummarySerializer(serializers.ModelSerializer):
+    """Exam without its questions, for list screens"""
+    professor_name = serializers.CharField(source='professor.username', read_only=True)
+    question_count = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = Exam
+        fields = ['id', 'title', 'description', 'professor', 'professor_name', 
+                  'duration_minutes', 'total_marks', 'is_published', 
+                  'created_at', 'updated_at', 'question_count']
+        read_only_fields = fields
+
+
 class ExamCreateSerializer(serializers.ModelSerializer):
     questions = QuestionSerializer(many=True)
+    pool_rules = QuestionPoolRuleSerializer(many=True, required=False)
     
     class Meta:
         model = Exam
-        fields = ['title', 'description', 'duration_minutes', 'is_published', 'questions']
+        fields = ['title', 'description', 'duration_minutes', 'is_published', 'pool_rules', 'questions']
     
     def create(self, validated_data):
+        """Create the exam, its pool rules, questions and choices in four INSERTs"""
         questions_data = validated_data.pop('questions')
-        exam = Exam.objects.create(**validated_data)
+        rules_data = validated_data.pop('pool_rules', [])
+        validated_data['total_marks'] = sum(
+            (question_data['marks'] for question_data in questions_data), Decimal(0)
+        )
         
-        total_marks = 0
-        for idx, question_data in enumerate(questions_data):
-            choices_data = question_data.pop('choices', [])
-            question = Question.objects.create(
-                exam=exam,
-                order=idx + 1,
-                **question_data
-            )
-            total_marks += question.marks
+        with transaction.atomic():
+            exam = Exam.objects.create(**validated_data)
+            QuestionPoolRule.objects.bulk_create([
+                QuestionPoolRule(exam=exam, order=idx + 1, **rule_data)
+                for idx, rule_data in enumerate(rules_data)
+            ])
             
-            for choice_data in choices_data:
-                Choice.objects.create(question=question, **choice_data)
-        
-        exam.total_marks = total_marks
-        exam.save()
+            choices_data = [question_data.pop('choices', []) for question_data in questions_data]
+            for question_data in questions_data:
+                # Questions are numbered in the order they were sent, as in question_bank imports
+                question_data.pop('order', None)
+            questions = Question.objects.bulk_create([
+                Question(exam=exam, order=idx + 1, **question_data)
+                for idx, question_data in enumerate(questions_data)
+            ])
+            Choice.objects.bulk_create([
+                Choice(question=question, **choice_data)
+                for question, question_choices in zip(questions, choices_data)
+                for choice_data in question_choices
+            ])
         
         return exam
+    
+    def to_representation(self, instance):
+        prefetch_related_objects([instance], 'pool_rules', 'questions__choices')
+        return super().to_representation(instance)
 
 
 class AnswerSerializer(serializers.ModelSerializer):
@@ -97,8 +167,38 @@ class StudentExamSerializer(serializers.ModelSerializer):
     class Meta:
         model = StudentExam
         fields = ['id', 'student', 'student_name', 'exam', 'exam_title', 
-                  'status', 'started_at', 'submitted_at', 'score', 'answers']
-        read_only_fields = ['student', 'started_at', 'submitted_at', 'score']
+                  'status', 'started_at', 'deadline', 'submitted_at', 'score', 'answers']
+        read_only_fields = ['student', 'started_at', 'deadline', 'submitted_at', 'score']
+    
+    def to_representation(self, instance):
+        """Include answers still waiting in the write-behind buffer"""
+        data = super().to_representation(instance)
+        if instance.status == 'in_progress' and answer_buffer.is_enabled():
+            buffered = answer_buffer.buffered_answers(instance)
+            if buffered:
+                answers = {answer['question']: answer for answer in data['answers']}
+                for question_id, entry in buffered.items():
+                    saved = answers.get(question_id, {'id': None, 'marks_obtained': None})
+                    answers[question_id] = {
+                        'id': saved['id'],
+                        'question': question_id,
+                        'selected_choices': entry['selected_choices'],
+                        'text_answer': entry['text_answer'],
+                        'marks_obtained': saved['marks_obtained'],
+                    }
+                data['answers'] = list(answers.values())
+        return data
+
+
+class AttemptStateSerializer(serializers.ModelSerializer):
+    """An attempt without its answers, for the start_exam payload"""
+    exam_id = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = StudentExam
+        fields = ['id', 'exam_id', 'status', 'started_at', 'deadline', 'submitted_at',
+                  'score', 'total_marks']
+        read_only_fields = fields
 
 
 class StudentExamDetailSerializer(serializers.ModelSerializer):
@@ -110,5 +210,24 @@ class StudentExamDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = StudentExam
         fields = ['id', 'student', 'student_name', 'exam', 'exam_title', 
-                  'status', 'started_at', 'submitted_at', 'score', 'answers']
-        read_only_fields = ['student', 'started_at', 'submitted_at']
+                  'status', 'started_at', 'deadline', 'submitted_at', 'score', 'answers']
+        read_only_fields = ['student', 'started_at', 'deadline', 'submitted_at']
+
+
+class AnswerMarksSerializer(serializers.Serializer):
+    """A professor-given mark for one answer"""
+    id = serializers.IntegerField()
+    marks_obtained = serializers.DecimalField(max_digits=5, decimal_places=2, allow_null=True)
+
+
+class StudentExamMarksSerializer(serializers.Serializer):
+    """Marks for several answers of one attempt, used by batch grading"""
+    id = serializers.IntegerField()
+    answers = AnswerMarksSerializer(many=True)
+
+
+class AnswerEntrySerializer(serializers.Serializer):
+    """One answer sent by a student while taking an exam"""
+    question_id = serializers.IntegerField()
+    selected_choices = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    text_answer = serializers.CharField(required=False, allow_blank=True, allow_null=True, default='')
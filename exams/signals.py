@@ -0,0 +1,63 @@
+from django.db.models import F, QuerySet
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import Signal, receiver
+
+from .answer_key import invalidate_answer_key
+from .answers import rebuild_choice_masks
+from .models import Exam, Question, QuestionPoolRule, Choice, Answer
+
+
+# Sent with ``student_exam_ids`` when attempts are submitted (by submit_exam)
+# and after their marks or scores are written (by exams.grading). Both use
+# conditional or bulk updates, so post_save is not sent for them.
+attempts_submitted = Signal()
+attempts_graded = Signal()
+
+
+def bump_exam_version(exam_id):
+    """Move an exam to a new version so cached answer keys are not reused"""
+    Exam.objects.filter(pk=exam_id).update(version=F('version') + 1)
+    invalidate_answer_key(exam_id)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, **kwargs):
+    bump_exam_version(instance.exam_id)
+
+
+@receiver(post_save, sender=QuestionPoolRule)
+@receiver(post_delete, sender=QuestionPoolRule)
+def pool_rule_changed(sender, instance, **kwargs):
+    bump_exam_version(instance.exam_id)
+
+
+def _deleted_directly(model, origin):
+    """True when a delete started from model itself rather than cascading from a parent"""
+    return isinstance(origin, model) or (isinstance(origin, QuerySet) and origin.model is model)
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def choice_changed(sender, instance, **kwargs):
+    if kwargs['signal'] is post_delete and not _deleted_directly(Choice, kwargs.get('origin')):
+        # Cascading from a question, exam or user: the question's answers
+        # go too and the question's own signal bumps the version
+        return
+    exam_id = Question.objects.filter(pk=instance.question_id).values_list('exam_id', flat=True).first()
+    if exam_id is not None:
+        bump_exam_version(exam_id)
+        if kwargs['signal'] is post_delete:
+            # Deleting a choice shifts the bits of later choices
+            rebuild_choice_masks(Answer.objects.filter(question_id=instance.question_id))
+
+
+@receiver(m2m_changed, sender=Answer.selected_choices.through)
+def selected_choices_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep choice_mask in sync when selected_choices is edited directly"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        rebuild_choice_masks(Answer.objects.filter(pk=instance.pk))
+    elif pk_set:
+        rebuild_choice_masks(Answer.objects.filter(pk__in=pk_set))
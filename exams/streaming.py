@@ -0,0 +1,23 @@
+"""Helpers shared by the streaming CSV/NDJSON endpoints"""
+import itertools
+
+
+# Written at the start of CSV downloads so Excel reads Persian text as UTF-8
+UTF8_BOM = '\ufeff'
+
+
+class Echo:
+    """File-like object whose write() returns the text, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def iter_chunks(iterable, size):
+    """Yield lists of up to ``size`` items from an iterable"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
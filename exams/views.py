@@ -1,30 +1,105 @@
+from datetime import datetime
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.utils import timezone
-from .models import Exam, Question, StudentExam, Answer
+from django.utils.dateparse import parse_date, parse_datetime
+from backend.pagination import KeysetPagination
+from .models import Exam, QuestionPoolRule, StudentExam
 from .serializers import (
-    ExamSerializer, ExamCreateSerializer, QuestionSerializer,
-    StudentExamSerializer, StudentExamDetailSerializer, AnswerSerializer
+    ExamSummarySerializer, ExamCreateSerializer, QuestionSerializer, exam_serializer_for,
+    StudentExamSerializer, StudentExamDetailSerializer, AnswerSerializer,
+    AnswerMarksSerializer, StudentExamMarksSerializer, AnswerEntrySerializer,
+    QuestionPoolRuleSerializer
 )
+from . import answer_buffer, question_bank
+from .answer_key import get_answer_key
+from .answers import validate_answer_entries, save_answers
+from .deadlines import deadline_for, is_past_deadline
+from .gradebook import export_gradebook
+from .grading import grade_student_exam, find_foreign_answers, apply_manual_marks
+from .item_analysis import get_item_analysis
+from .jobs import enqueue_grading
+from .payload import get_exam_payload, render_attempt_payload, etag_matches
+from .pools import new_seed, draw_for_attempt, attempt_questions, drawn_total_marks
+from .signals import attempts_submitted, bump_exam_version
+
+
+def _parse_datetime_param(value):
+    """Parse an ISO date or datetime query parameter into an aware datetime"""
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            parsed_date = parse_date(value)
+            if parsed_date is None:
+                return None
+            parsed = datetime.combine(parsed_date, datetime.min.time())
+    except ValueError:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
 
 
 class ExamViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         user = self.request.user
         if user.role == 'professor':
-            return Exam.objects.filter(professor=user).prefetch_related('questions__choices')
+            queryset = Exam.objects.filter(professor=user)
         elif user.role == 'student':
-            return Exam.objects.filter(is_published=True).prefetch_related('questions__choices')
-        return Exam.objects.none()
+            queryset = Exam.objects.filter(is_published=True)
+        else:
+            return Exam.objects.none()
+        
+        if self.action == 'list':
+            return self._filter_list(queryset).select_related('professor').annotate(
+                question_count=Count('questions')
+            )
+        queryset = queryset.select_related('professor')
+        # retrieve serves a cached payload and only prefetches on a miss
+        if self.action != 'retrieve':
+            queryset = queryset.prefetch_related('pool_rules', 'questions__choices')
+        return queryset
+    
+    def _filter_list(self, queryset):
+        """Apply ?is_published=, ?created_after=, ?created_before= and ?search="""
+        params = self.request.query_params
+        
+        is_published = params.get('is_published')
+        if is_published is not None:
+            if is_published.lower() not in ('true', 'false', '1', '0'):
+                raise ValidationError({'is_published': 'Expected true or false'})
+            queryset = queryset.filter(is_published=is_published.lower() in ('true', '1'))
+        
+        for param, lookup in (('created_after', 'created_at__gte'), ('created_before', 'created_at__lt')):
+            value = params.get(param)
+            if value:
+                parsed = _parse_datetime_param(value)
+                if parsed is None:
+                    raise ValidationError({param: 'Expected an ISO date or datetime'})
+                queryset = queryset.filter(**{lookup: parsed})
+        
+        search = params.get('search', '').strip()
+        if search:
+            queryset = queryset.filter(title__icontains=search)
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'create':
             return ExamCreateSerializer
-        return ExamSerializer
+        if self.action == 'list':
+            return ExamSummarySerializer
+        return exam_serializer_for(self.request.user.role)
     
     def get_serializer_context(self):
         """Pass request context to serializers"""
@@ -32,6 +107,19 @@ class ExamViewSet(viewsets.ModelViewSet):
         context['request'] = self.request
         return context
     
+    def retrieve(self, request, *args, **kwargs):
+        """Serve the pre-rendered exam body with ETag / 304 support"""
+        exam = self.get_object()
+        etag, body = get_exam_payload(exam, request)
+        
+        if etag_matches(request, etag):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+    
     def perform_create(self, serializer):
         if self.request.user.role != 'professor':
             raise PermissionError("Only professors can create exams")
@@ -56,11 +144,102 @@ class ExamViewSet(viewsets.ModelViewSet):
         exam.is_published = False
         exam.save()
         return Response({'status': 'Exam unpublished'})
+    
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """Stream the exam's questions as NDJSON (default) or CSV"""
+        exam = self.get_object()
+        if exam.professor != request.user:
+            return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+        
+        file_format = request.query_params.get('file_format', 'ndjson')
+        if file_format not in question_bank.FORMATS:
+            return Response({'error': 'file_format must be ndjson or csv'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        response = StreamingHttpResponse(
+            question_bank.export_questions(exam, file_format),
+            content_type=question_bank.CONTENT_TYPES[file_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="exam-{exam.pk}-questions.{file_format}"'
+        return response
+    
+    @action(detail=True, methods=['get'])
+    def gradebook(self, request, pk=None):
+        """Stream one CSV row per attempt with per-question marks"""
+        exam = self.get_object()
+        if exam.professor != request.user:
+            return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+        
+        response = StreamingHttpResponse(export_gradebook(exam), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="exam-{exam.pk}-gradebook.csv"'
+        return response
+    
+    @action(detail=True, methods=['get'], url_path='item-analysis')
+    def item_analysis(self, request, pk=None):
+        """Difficulty, discrimination and choice statistics per question"""
+        exam = self.get_object()
+        if exam.professor != request.user:
+            return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+        
+        return Response(get_item_analysis(exam))
+    
+    @action(detail=True, methods=['get', 'put'], url_path='pool-rules')
+    def pool_rules(self, request, pk=None):
+        """Read or replace the rules that draw each attempt's questions"""
+        exam = self.get_object()
+        if exam.professor != request.user:
+            return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+        
+        if request.method == 'PUT':
+            rules_serializer = QuestionPoolRuleSerializer(data=request.data.get('rules', []), many=True)
+            rules_serializer.is_valid(raise_exception=True)
+            with transaction.atomic():
+                QuestionPoolRule.objects.filter(exam=exam).delete()
+                QuestionPoolRule.objects.bulk_create([
+                    QuestionPoolRule(exam=exam, order=idx + 1, **rule_data)
+                    for idx, rule_data in enumerate(rules_serializer.validated_data)
+                ])
+                # bulk_create sends no signals, so move the exam to a new version here
+                bump_exam_version(exam.pk)
+        
+        rules = QuestionPoolRule.objects.filter(exam=exam)
+        return Response({'rules': QuestionPoolRuleSerializer(rules, many=True).data})
+    
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_questions(self, request):
+        """Append questions from an uploaded NDJSON or CSV file to an exam"""
+        if request.user.role != 'professor':
+            return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+        
+        try:
+            exam = Exam.objects.get(pk=request.data.get('exam_id'), professor=request.user)
+        except (Exam.DoesNotExist, ValueError, TypeError):
+            return Response({'error': 'Exam not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        file_format = request.data.get('file_format') or ('csv' if upload.name.lower().endswith('.csv') else 'ndjson')
+        if file_format not in question_bank.FORMATS:
+            return Response({'error': 'file_format must be ndjson or csv'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            imported = question_bank.import_questions(exam, upload.file, file_format)
+        except question_bank.QuestionBankError as exc:
+            return Response({'error': 'Invalid questions', 'details': exc.errors},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({'status': 'Questions imported', 'count': imported}, status=status.HTTP_201_CREATED)
 
 
 class StudentExamViewSet(viewsets.ModelViewSet):
     serializer_class = StudentExamSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    # started_at is null until an attempt starts, so it cannot be a cursor
+    # column; ids follow start order since start_exam creates the attempt
+    pagination_ordering = ('-id',)
     
     def get_queryset(self):
         user = self.request.user
@@ -90,31 +269,52 @@ class StudentExamViewSet(viewsets.ModelViewSet):
         if request.user.role != 'professor' or student_exam.exam.professor != request.user:
             return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
         
-        # Update answer marks if provided
-        answers_data = request.data.get('answers', [])
-        for answer_data in answers_data:
-            answer_id = answer_data.get('id')
-            marks = answer_data.get('marks_obtained')
-            
-            try:
-                answer = Answer.objects.get(id=answer_id, student_exam=student_exam)
-                answer.marks_obtained = marks
-                answer.save()
-            except Answer.DoesNotExist:
-                continue
-        
-        # Recalculate total score
-        total_score = sum(
-            answer.marks_obtained or 0 
-            for answer in student_exam.answers.all()
-        )
-        student_exam.score = total_score
-        student_exam.status = 'graded'
-        student_exam.save()
+        marks_serializer = AnswerMarksSerializer(data=request.data.get('answers', []), many=True)
+        marks_serializer.is_valid(raise_exception=True)
+        marks_by_attempt = {
+            student_exam.pk: {
+                entry['id']: entry['marks_obtained'] for entry in marks_serializer.validated_data
+            }
+        }
         
-        serializer = self.get_serializer(student_exam)
+        invalid = find_foreign_answers(marks_by_attempt)
+        if invalid:
+            return Response({'error': 'Answers do not belong to this exam', 'answers': invalid},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        apply_manual_marks(marks_by_attempt)
+        
+        serializer = self.get_serializer(self.get_queryset().get(pk=student_exam.pk))
         return Response(serializer.data)
     
+    @action(detail=False, methods=['post'])
+    def grade_batch(self, request):
+        """Save marks for several attempts in one transaction"""
+        if request.user.role != 'professor':
+            return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+        
+        batch_serializer = StudentExamMarksSerializer(data=request.data.get('student_exams', []), many=True)
+        batch_serializer.is_valid(raise_exception=True)
+        marks_by_attempt = {}
+        for item in batch_serializer.validated_data:
+            marks = marks_by_attempt.setdefault(item['id'], {})
+            marks.update((entry['id'], entry['marks_obtained']) for entry in item['answers'])
+        
+        owned = StudentExam.objects.filter(pk__in=marks_by_attempt, exam__professor=request.user).count()
+        if owned != len(marks_by_attempt):
+            return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+        
+        invalid = find_foreign_answers(marks_by_attempt)
+        if invalid:
+            return Response({'error': 'Answers do not belong to their exams', 'answers': invalid},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        scores = apply_manual_marks(marks_by_attempt)
+        return Response([
+            {'id': student_exam_id, 'status': 'graded', 'score': score}
+            for student_exam_id, score in scores.items()
+        ])
+    
     @action(detail=False, methods=['post'])
     def start_exam(self, request):
         if request.user.role != 'student':
@@ -127,16 +327,44 @@ class StudentExamViewSet(viewsets.ModelViewSet):
         except Exam.DoesNotExist:
             return Response({'error': 'Exam not found'}, status=status.HTTP_404_NOT_FOUND)
         
+        started_at = timezone.now()
         student_exam, created = StudentExam.objects.get_or_create(
             student=request.user,
             exam=exam,
-            defaults={'status': 'in_progress', 'started_at': timezone.now()}
+            defaults={'status': 'in_progress', 'started_at': started_at,
+                      'deadline': deadline_for(exam, started_at), 'seed': new_seed()}
         )
         
-        if not created and student_exam.status == 'submitted':
+        if not created and student_exam.status in ('submitted', 'graded'):
             return Response({'error': 'Exam already submitted'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
+        update_fields = []
+        if student_exam.status == 'not_started':
+            student_exam.status = 'in_progress'
+            student_exam.started_at = started_at
+            student_exam.deadline = deadline_for(exam, started_at)
+            update_fields += ['status', 'started_at', 'deadline']
+            if student_exam.seed is None:
+                student_exam.seed = new_seed()
+                update_fields.append('seed')
+        
+        if created or update_fields:
+            # Keep the draw, so later pool edits do not change this attempt;
+            # its possible marks are those of the drawn questions
+            question_ids = draw_for_attempt(exam, student_exam)
+            if question_ids is not None:
+                student_exam.question_ids = question_ids
+                student_exam.total_marks = drawn_total_marks(question_ids)
+                update_fields += ['question_ids', 'total_marks']
+        
+        if update_fields:
+            student_exam.save(update_fields=update_fields)
+        
+        if request.query_params.get('compact', '').lower() in ('true', '1'):
+            body = render_attempt_payload(student_exam, exam, request)
+            return HttpResponse(body, content_type='application/json')
+        
         serializer = self.get_serializer(student_exam)
         return Response(serializer.data)
     
@@ -147,78 +375,118 @@ class StudentExamViewSet(viewsets.ModelViewSet):
         if student_exam.student != request.user:
             return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
         
-        if student_exam.status == 'submitted':
+        if student_exam.status in ('submitted', 'graded'):
             return Response({'error': 'Exam already submitted'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
-        question_id = request.data.get('question_id')
-        selected_choices = request.data.get('selected_choices', [])
-        text_answer = request.data.get('text_answer', '')
+        if is_past_deadline(student_exam):
+            return Response({'error': 'Exam time is over', 'deadline': student_exam.deadline},
+                          status=status.HTTP_400_BAD_REQUEST)
         
-        try:
-            question = Question.objects.get(id=question_id, exam=student_exam.exam)
-        except Question.DoesNotExist:
-            return Response({'error': 'Question not found'}, status=status.HTTP_404_NOT_FOUND)
+        entry_serializer = AnswerEntrySerializer(data=request.data)
+        entry_serializer.is_valid(raise_exception=True)
+        entries = [entry_serializer.validated_data]
         
-        answer, created = Answer.objects.get_or_create(
-            student_exam=student_exam,
-            question=question
+        unknown_questions, foreign_choices = validate_answer_entries(
+            student_exam.exam_id, entries, attempt_questions(student_exam.exam, student_exam)
         )
+        if unknown_questions:
+            return Response({'error': 'Question not found'}, status=status.HTTP_404_NOT_FOUND)
+        if foreign_choices:
+            return Response({'error': 'Choices do not belong to the question', 'choices': foreign_choices},
+                          status=status.HTTP_400_BAD_REQUEST)
         
-        answer.text_answer = text_answer
-        answer.selected_choices.set(selected_choices)
-        answer.save()
+        error = self._store_answers(student_exam, entries)
+        if error:
+            return error
         
         return Response({'status': 'Answer saved'})
     
     @action(detail=True, methods=['post'])
-    def submit_exam(self, request, pk=None):
+    def submit_answers(self, request, pk=None):
+        """Save a batch of answers (autosave) in a fixed number of queries"""
         student_exam = self.get_object()
         
         if student_exam.student != request.user:
             return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
         
-        if student_exam.status == 'submitted':
+        if student_exam.status in ('submitted', 'graded'):
             return Response({'error': 'Exam already submitted'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
-        student_exam.status = 'submitted'
-        student_exam.submitted_at = timezone.now()
-        student_exam.save()
+        if is_past_deadline(student_exam):
+            return Response({'error': 'Exam time is over', 'deadline': student_exam.deadline},
+                          status=status.HTTP_400_BAD_REQUEST)
         
-        # Auto-grade objective questions
-        self._auto_grade(student_exam)
+        entry_serializer = AnswerEntrySerializer(data=request.data.get('answers', []), many=True)
+        entry_serializer.is_valid(raise_exception=True)
+        entries = entry_serializer.validated_data
         
-        return Response({'status': 'Exam submitted', 'score': student_exam.score})
+        unknown_questions, foreign_choices = validate_answer_entries(
+            student_exam.exam_id, entries, attempt_questions(student_exam.exam, student_exam)
+        )
+        if unknown_questions or foreign_choices:
+            return Response({'error': 'Invalid answers',
+                             'questions': unknown_questions, 'choices': foreign_choices},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        error = self._store_answers(student_exam, entries)
+        if error:
+            return error
+        
+        return Response({'status': 'Answers saved', 'count': len({entry['question_id'] for entry in entries})})
     
-    def _auto_grade(self, student_exam):
-        total_score = 0
+    def _store_answers(self, student_exam, entries):
+        """
+        Write answers through the write-behind buffer when it is enabled.
+        Returns an error response when the buffer refuses them.
+        """
+        if not answer_buffer.is_enabled():
+            answer_key = get_answer_key(student_exam.exam_id, student_exam.exam.version)
+            save_answers(student_exam.pk, entries, answer_key)
+            return None
+        try:
+            answer_buffer.buffer_answers(student_exam.pk, entries)
+        except answer_buffer.AttemptClosed:
+            # Submitted while this request was on its way
+            return Response({'error': 'Exam already submitted'}, status=status.HTTP_400_BAD_REQUEST)
+        return None
+    
+    @action(detail=True, methods=['post'])
+    def submit_exam(self, request, pk=None):
+        student_exam = self.get_object()
+        
+        if student_exam.student != request.user:
+            return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
         
-        for answer in student_exam.answers.all():
-            question = answer.question
+        submitted_at = timezone.now()
+        with transaction.atomic():
+            if answer_buffer.is_enabled():
+                # Takes the attempt's row lock until commit, so autosaves
+                # waiting on it see the new status and are refused
+                answer_buffer.flush_attempt(student_exam.pk)
             
-            if question.question_type in ['single_choice', 'true_false']:
-                correct_choice = question.choices.filter(is_correct=True).first()
-                selected = answer.selected_choices.first()
-                
-                if selected and selected == correct_choice:
-                    answer.marks_obtained = question.marks
-                else:
-                    answer.marks_obtained = 0
-                answer.save()
-                total_score += answer.marks_obtained
+            # Conditional update so a double click cannot submit (and queue) twice
+            submitted = StudentExam.objects.filter(
+                pk=student_exam.pk,
+                status__in=['not_started', 'in_progress']
+            ).update(status='submitted', submitted_at=submitted_at)
+            if not submitted:
+                return Response({'error': 'Exam already submitted'}, 
+                              status=status.HTTP_400_BAD_REQUEST)
             
-            elif question.question_type == 'multiple_choice':
-                correct_choices = set(question.choices.filter(is_correct=True))
-                selected_choices = set(answer.selected_choices.all())
-                
-                if correct_choices == selected_choices:
-                    answer.marks_obtained = question.marks
-                else:
-                    answer.marks_obtained = 0
-                answer.save()
-                total_score += answer.marks_obtained
-        
-        student_exam.score = total_score
-        student_exam.status = 'graded'
-        student_exam.save()
+            student_exam.status = 'submitted'
+            student_exam.submitted_at = submitted_at
+            attempts_submitted.send(sender=StudentExam, student_exam_ids=[student_exam.pk])
+            
+            # Auto-grade objective questions
+            self._auto_grade(student_exam)
+        
+        return Response({'status': 'Exam submitted', 'score': student_exam.score})
+    
+    def _auto_grade(self, student_exam):
+        """Queue grading for grade_worker, or grade inline when the queue is disabled"""
+        if getattr(settings, 'EXAMS_GRADE_IN_BACKGROUND', True):
+            enqueue_grading([student_exam.pk])
+        else:
+            grade_student_exam(student_exam)
@@ -5,7 +5,7 @@ import { ProfessorExamsView } from './ProfessorExamsView';
 import { SWOTSubmissionsView } from './SWOTSubmissionsView';
 import { Header } from './Header';
 import { Footer } from './Footer';
-import { api, SWOTAnalysis, StudentMessage, StudentInfo } from '../services/api';
+import { api, SWOTAnalysis, StudentMessage, RosterStudent } from '../services/api';
 import {
   Home,
   FileText,
@@ -31,15 +31,24 @@ export function ProfessorDashboard() {
   const [messages, setMessages] = useState<StudentMessage[]>([]);
   const [unreadCount, setUnreadCount] = useState(0);
   const [studentCount, setStudentCount] = useState(0);
-  const [students, setStudents] = useState<StudentInfo[]>([]);
+  const [students, setStudents] = useState<RosterStudent[]>([]);
+  const [studentsNext, setStudentsNext] = useState<string | null>(null);
+  const [studentSearch, setStudentSearch] = useState('');
   const [loading, setLoading] = useState(true);
   const [studentsLoading, setStudentsLoading] = useState(false);
 
   useEffect(() => {
     loadSWOTAnalyses();
     loadMessages();
-    loadUnreadCount();
-    loadStudentCount();
+    loadCounters();
+
+    // New messages arrive over the event stream instead of polling
+    return api.subscribeEvents({
+      'message.created': () => {
+        loadMessages();
+        loadCounters();
+      },
+    });
   }, []);
 
   const loadSWOTAnalyses = async () => {
@@ -62,41 +71,53 @@ export function ProfessorDashboard() {
     }
   };
 
-  const loadUnreadCount = async () => {
+  // One cached call for every counter on the dashboard
+  const loadCounters = async () => {
     try {
-      const count = await api.getUnreadCount();
-      setUnreadCount(count);
+      const counters = await api.getDashboardCounters();
+      setUnreadCount(counters.unread_messages);
+      setStudentCount(counters.students);
     } catch (err) {
-      console.error('Failed to load unread count:', err);
+      console.error('Failed to load dashboard counters:', err);
     }
   };
 
-  const loadStudentCount = async () => {
+  const loadStudents = async (search = studentSearch) => {
+    setStudentsLoading(true);
     try {
-      const count = await api.getStudentCount();
-      setStudentCount(count);
+      const page = await api.getStudents({ search });
+      setStudents(page.results);
+      setStudentsNext(page.next);
     } catch (err) {
-      console.error('Failed to load student count:', err);
+      console.error('Failed to load students:', err);
+    } finally {
+      setStudentsLoading(false);
     }
   };
 
-  const loadStudents = async () => {
-    setStudentsLoading(true);
+  const loadMoreStudents = async () => {
+    if (!studentsNext) return;
     try {
-      const data = await api.getAllStudents();
-      setStudents(data);
+      const page = await api.getPage<RosterStudent>(studentsNext);
+      setStudents((current) => [...current, ...page.results]);
+      setStudentsNext(page.next);
     } catch (err) {
       console.error('Failed to load students:', err);
-    } finally {
-      setStudentsLoading(false);
     }
   };
 
+  // Search runs on the server; wait for typing to pause before querying
+  useEffect(() => {
+    if (activeMenu !== 'students') return;
+    const timer = setTimeout(() => loadStudents(studentSearch), 300);
+    return () => clearTimeout(timer);
+  }, [studentSearch]);
+
   const handleMarkRead = async (messageId: number) => {
     try {
       await api.markMessageRead(messageId);
       await loadMessages();
-      await loadUnreadCount();
+      await loadCounters();
     } catch (err) {
       console.error('Failed to mark message as read:', err);
     }
@@ -404,8 +425,16 @@ export function ProfessorDashboard() {
               }}
             >
               <h1 className="text-3xl text-white mb-8">دانشجویان</h1>
+
+              <input
+                type="search"
+                value={studentSearch}
+                onChange={(e) => setStudentSearch(e.target.value)}
+                placeholder="جستجو بر اساس نام یا شماره دانشجویی"
+                className="w-full mb-6 px-4 py-3 bg-slate-800/50 border border-slate-700/50 rounded-xl text-white placeholder-gray-500 focus:outline-none focus:border-purple-500"
+              />
               
-              {studentsLoading ? (
+              {studentsLoading && students.length === 0 ? (
                 <div className="flex items-center justify-center py-20">
                   <div className="animate-spin w-12 h-12 border-4 border-purple-500 border-t-transparent rounded-full" />
                 </div>
@@ -471,6 +500,16 @@ export function ProfessorDashboard() {
                       </tbody>
                     </table>
                   </div>
+                  {studentsNext && (
+                    <div className="p-4 text-center border-t border-slate-700/50">
+                      <button
+                        onClick={loadMoreStudents}
+                        className="px-6 py-2 bg-purple-500/20 text-purple-400 rounded-lg hover:bg-purple-500/30 transition-colors"
+                      >
+                        نمایش بیشتر
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </motion.div>
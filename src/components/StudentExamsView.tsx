@@ -14,6 +14,19 @@ export function StudentExamsView() {
 
   useEffect(() => {
     loadData();
+
+    // Grading results are pushed over the event stream
+    return api.subscribeEvents({
+      'exam.graded': (data) => {
+        setStudentExams((current) =>
+          current.map((se) =>
+            se.id === data.id
+              ? { ...se, status: data.status, score: data.score === null ? null : Number(data.score) }
+              : se
+          )
+        );
+      },
+    });
   }, []);
 
   const loadData = async () => {
@@ -1,7 +1,7 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { motion, AnimatePresence } from 'motion/react';
 import { X, Clock, CheckCircle } from 'lucide-react';
-import { api, Exam, Question, StudentExam } from '../services/api';
+import { api, Exam, Question, ExamSession } from '../services/api';
 
 interface TakeExamModalProps {
   exam: Exam;
@@ -11,13 +11,14 @@ interface TakeExamModalProps {
 }
 
 export function TakeExamModal({ exam, isOpen, onClose, onSuccess }: TakeExamModalProps) {
-  const [studentExam, setStudentExam] = useState<StudentExam | null>(null);
+  const [studentExam, setStudentExam] = useState<ExamSession | null>(null);
   const [answers, setAnswers] = useState<Record<number, { selectedChoices: number[]; textAnswer: string }>>({});
   const [currentQuestionIndex, setCurrentQuestionIndex] = useState(0);
   const [loading, setLoading] = useState(false);
   const [submitting, setSubmitting] = useState(false);
   const [error, setError] = useState('');
   const [timeLeft, setTimeLeft] = useState(0);
+  const pendingAnswers = useRef<Record<number, { selectedChoices: number[]; textAnswer: string }>>({});
 
   useEffect(() => {
     if (isOpen && exam) {
@@ -44,9 +45,21 @@ export function TakeExamModal({ exam, isOpen, onClose, onSuccess }: TakeExamModa
     setLoading(true);
     setError('');
     try {
-      const response = await api.startExam(exam.id);
-      setStudentExam(response);
-      setTimeLeft(exam.duration_minutes * 60);
+      // One request returns the exam, saved answers and the server deadline,
+      // so reopening the modal resumes where the student left off
+      const session = await api.startExam(exam.id);
+      setStudentExam(session);
+      const restored: Record<number, { selectedChoices: number[]; textAnswer: string }> = {};
+      Object.entries(session.answers).forEach(([questionId, answer]) => {
+        restored[Number(questionId)] = Array.isArray(answer)
+          ? { selectedChoices: answer, textAnswer: '' }
+          : { selectedChoices: [], textAnswer: answer };
+      });
+      setAnswers(restored);
+      const remaining = session.deadline
+        ? Date.parse(session.deadline) - Date.parse(session.server_time)
+        : exam.duration_minutes * 60 * 1000;
+      setTimeLeft(Math.max(0, Math.floor(remaining / 1000)));
     } catch (err: any) {
       setError(err.message || 'خطا در شروع آزمون');
     } finally {
@@ -59,8 +72,37 @@ export function TakeExamModal({ exam, isOpen, onClose, onSuccess }: TakeExamModa
       ...answers,
       [questionId]: { selectedChoices, textAnswer },
     });
+    pendingAnswers.current[questionId] = { selectedChoices, textAnswer };
   };
 
+  // Save every changed answer in one request
+  const flushAnswers = async (toSave: Record<number, { selectedChoices: number[]; textAnswer: string }>) => {
+    if (!studentExam || Object.keys(toSave).length === 0) return;
+    await api.submitAnswers(
+      studentExam.id,
+      Object.entries(toSave).map(([questionId, answer]) => ({
+        question_id: Number(questionId),
+        selected_choices: answer.selectedChoices,
+        text_answer: answer.textAnswer,
+      }))
+    );
+  };
+
+  // Autosave changed answers every few seconds
+  useEffect(() => {
+    if (!studentExam) return;
+    const autosave = setInterval(async () => {
+      const toSave = pendingAnswers.current;
+      pendingAnswers.current = {};
+      try {
+        await flushAnswers(toSave);
+      } catch {
+        pendingAnswers.current = { ...toSave, ...pendingAnswers.current };
+      }
+    }, 5000);
+    return () => clearInterval(autosave);
+  }, [studentExam]);
+
   const handleSubmit = async () => {
     if (!studentExam) return;
 
@@ -68,15 +110,9 @@ export function TakeExamModal({ exam, isOpen, onClose, onSuccess }: TakeExamModa
     setError('');
 
     try {
-      // Submit all answers
-      for (const [questionId, answer] of Object.entries(answers)) {
-        await api.submitAnswer(
-          studentExam.id,
-          Number(questionId),
-          answer.selectedChoices,
-          answer.textAnswer
-        );
-      }
+      // Submit all answers in one request
+      pendingAnswers.current = {};
+      await flushAnswers(answers);
 
       // Submit exam
       await api.submitExam(studentExam.id);
@@ -89,6 +125,8 @@ export function TakeExamModal({ exam, isOpen, onClose, onSuccess }: TakeExamModa
     }
   };
 
+  const currentExam = studentExam?.exam ?? exam;
+
   const formatTime = (seconds: number) => {
     const mins = Math.floor(seconds / 60);
     const secs = seconds % 60;
@@ -165,17 +203,17 @@ export function TakeExamModal({ exam, isOpen, onClose, onSuccess }: TakeExamModa
               {/* Question Progress */}
               <div className="flex items-center justify-between mb-6">
                 <div className="text-gray-400 text-sm">
-                  سوال {currentQuestionIndex + 1} از {exam.questions?.length || 0}
+                  سوال {currentQuestionIndex + 1} از {currentExam.questions?.length || 0}
                 </div>
                 <div className="flex gap-2">
-                  {exam.questions?.map((_, index) => (
+                  {currentExam.questions?.map((_, index) => (
                     <button
                       key={index}
                       onClick={() => setCurrentQuestionIndex(index)}
                       className={`w-8 h-8 rounded-lg text-sm transition-colors ${
                         index === currentQuestionIndex
                           ? 'bg-purple-600 text-white'
-                          : answers[exam.questions![index].id]
+                          : answers[currentExam.questions![index].id]
                           ? 'bg-green-600/30 text-green-400 hover:bg-green-600/50'
                           : 'bg-slate-700 text-gray-400 hover:bg-slate-600'
                       }`}
@@ -187,8 +225,8 @@ export function TakeExamModal({ exam, isOpen, onClose, onSuccess }: TakeExamModa
               </div>
 
               {/* Current Question */}
-              {exam.questions && exam.questions[currentQuestionIndex] && (() => {
-                const question = exam.questions[currentQuestionIndex];
+              {currentExam.questions && currentExam.questions[currentQuestionIndex] && (() => {
+                const question = currentExam.questions[currentQuestionIndex];
                 return (
                 <div key={question.id} className="p-6 bg-slate-900/50 border border-slate-700 rounded-xl">
                   <div className="flex items-start justify-between mb-4">
@@ -254,11 +292,11 @@ export function TakeExamModal({ exam, isOpen, onClose, onSuccess }: TakeExamModa
                   سوال قبل
                 </button>
                 <div className="text-gray-400 text-sm">
-                  {Object.keys(answers).length} از {exam.questions?.length || 0} پاسخ داده شده
+                  {Object.keys(answers).length} از {currentExam.questions?.length || 0} پاسخ داده شده
                 </div>
                 <button
-                  onClick={() => setCurrentQuestionIndex(Math.min((exam.questions?.length || 1) - 1, currentQuestionIndex + 1))}
-                  disabled={currentQuestionIndex === (exam.questions?.length || 1) - 1}
+                  onClick={() => setCurrentQuestionIndex(Math.min((currentExam.questions?.length || 1) - 1, currentQuestionIndex + 1))}
+                  disabled={currentQuestionIndex === (currentExam.questions?.length || 1) - 1}
                   className="px-6 py-2 bg-slate-700 text-white rounded-lg hover:bg-slate-600 transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
                 >
                   سوال بعد
@@ -268,7 +306,7 @@ export function TakeExamModal({ exam, isOpen, onClose, onSuccess }: TakeExamModa
 
             <div className="flex items-center justify-between p-6 border-t border-slate-700 bg-slate-800">
               <div className="text-gray-400 text-sm">
-                {Object.keys(answers).length} از {exam.questions?.length || 0} سوال پاسخ داده شده
+                {Object.keys(answers).length} از {currentExam.questions?.length || 0} سوال پاسخ داده شده
               </div>
               <button
                 onClick={handleSubmit}
@@ -19,6 +19,7 @@ export interface Question {
   text: string;
   question_type: 'single' | 'multiple' | 'true_false' | 'descriptive';
   marks: number;
+  tag?: string;
   choices?: Choice[];
 }
 
@@ -34,10 +35,26 @@ export interface StudentExam {
   student: number;
   start_time: string;
   end_time: string | null;
+  deadline: string | null;
   score: number | null;
   status: 'not_started' | 'in_progress' | 'submitted' | 'graded';
 }
 
+// start_exam?compact=1: the attempt, its saved answers and the exam in one response
+export interface ExamSession {
+  id: number;
+  exam_id: number;
+  status: StudentExam['status'];
+  started_at: string;
+  deadline: string | null;
+  submitted_at: string | null;
+  score: number | null;
+  total_marks: string | null;
+  server_time: string;
+  answers: Record<number, number[] | string>;
+  exam: Exam;
+}
+
 export interface SWOTQuestion {
   id: number;
   category: 'strength' | 'weakness' | 'opportunity' | 'threat';
@@ -72,6 +89,60 @@ export interface StudentInfo {
   student_id: string;
 }
 
+// Row of the professor roster (GET /api/auth/students/)
+export interface RosterStudent {
+  id: number;
+  name: string;
+  student_id: string;
+  average: number | null;
+  has_swot: boolean;
+  exam_count: number;
+}
+
+export interface RosterQuery {
+  search?: string;
+  has_swot?: boolean;
+  min_average?: number;
+  max_average?: number;
+  ordering?: 'name' | '-name' | 'average' | '-average';
+  page_size?: number;
+}
+
+// Professor dashboard counts (GET /api/dashboard/counters/)
+export interface DashboardCounters {
+  students: number;
+  exams: number;
+  pending_gradings: number;
+  unread_messages: number;
+}
+
+// Server-sent events (GET /api/events/stream/?token=...)
+export interface ServerEvents {
+  'message.created': { id: number; title: string; student: number; professor: number | null; created_at: string };
+  'message.read': { id: number };
+  'exam.graded': { id: number; exam: number; status: StudentExam['status']; score: string | null };
+}
+
+export type ServerEventHandlers = {
+  [K in keyof ServerEvents]?: (data: ServerEvents[K]) => void;
+};
+
+// Paginated list responses
+//
+// GET /api/exams/, /api/student-exams/, /api/messages/, /api/swot/analyses/
+// and /api/auth/students/
+// return one page at a time:
+//   { next: string | null, previous: string | null, results: T[] }
+// `next` / `previous` are absolute URLs carrying an opaque `cursor` parameter;
+// request them as-is to move between pages and stop when `next` is null.
+// Pass `?page_size=N` (max 100, default 20) on the first request to change
+// the page size; it is kept in the cursor URLs.
+export interface Paginated<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
 // Base API configuration
 export const api = {
   baseURL: API_URL,
@@ -129,6 +200,28 @@ export const api = {
     return this.fetch(path, { ...options, method: 'DELETE' });
   },
 
+  // Fetch one page of a paginated list; `path` may also be a `next` URL
+  async getPage<T>(path: string): Promise<Paginated<T>> {
+    const relative = path.startsWith(this.baseURL) ? path.slice(this.baseURL.length) : path;
+    const response = await this.get(relative);
+    if (!response.ok) {
+      throw new Error('Failed to load page');
+    }
+    return response.json();
+  },
+
+  // Follow `next` links and collect every item of a paginated list
+  async getAllPages<T>(path: string): Promise<T[]> {
+    const items: T[] = [];
+    let next: string | null = path;
+    while (next) {
+      const page: Paginated<T> = await this.getPage<T>(next);
+      items.push(...page.results);
+      next = page.next;
+    }
+    return items;
+  },
+
   // Authentication methods
   async professorLogin(username: string, password: string) {
     const response = await fetch(this.url('/api/auth/professor/login/'), {
@@ -192,6 +285,39 @@ export const api = {
     return response.json();
   },
 
+  // Search, filter and sort the roster on the server; follow `next` for more
+  async getStudents(query: RosterQuery = {}): Promise<Paginated<RosterStudent>> {
+    const params = new URLSearchParams();
+    Object.entries(query).forEach(([key, value]) => {
+      if (value !== undefined && value !== '') {
+        params.set(key, String(value));
+      }
+    });
+    const qs = params.toString();
+    return this.getPage<RosterStudent>(`${endpoints.auth.students}${qs ? `?${qs}` : ''}`);
+  },
+
+  async getDashboardCounters(): Promise<DashboardCounters> {
+    const response = await this.get(endpoints.dashboard.counters);
+    if (!response.ok) {
+      throw new Error('Failed to get dashboard counters');
+    }
+    return response.json();
+  },
+
+  // Open one event stream instead of polling; returns a function that closes it.
+  // EventSource reconnects by itself and resumes after the last event id.
+  subscribeEvents(handlers: ServerEventHandlers): () => void {
+    const token = localStorage.getItem('token') || '';
+    const source = new EventSource(this.url(`${endpoints.events.stream}?token=${encodeURIComponent(token)}`));
+    (Object.keys(handlers) as (keyof ServerEvents)[]).forEach((type) => {
+      source.addEventListener(type, (event) => {
+        handlers[type]?.(JSON.parse((event as MessageEvent).data));
+      });
+    });
+    return () => source.close();
+  },
+
   clearToken() {
     localStorage.removeItem('access_token');
     localStorage.removeItem('refresh_token');
@@ -215,6 +341,27 @@ export const api = {
     return response.json();
   },
 
+  // Exam taking methods
+  async startExam(examId: number): Promise<ExamSession> {
+    const response = await this.post(`${endpoints.exams.startExam}?compact=1`, { exam_id: examId });
+    if (!response.ok) {
+      const data = await response.json().catch(() => ({}));
+      throw new Error(data.error || 'Failed to start exam');
+    }
+    return response.json();
+  },
+
+  async submitAnswers(
+    studentExamId: number,
+    answers: { question_id: number; selected_choices: number[]; text_answer: string }[]
+  ) {
+    const response = await this.post(`/api/student-exams/${studentExamId}/submit_answers/`, { answers });
+    if (!response.ok) {
+      throw new Error('Failed to save answers');
+    }
+    return response.json();
+  },
+
   async getSWOTSubmissions() {
     const response = await this.get('/api/swot/analyses/');
     if (!response.ok) {
@@ -231,14 +378,16 @@ export const endpoints = {
     studentLogin: '/api/auth/student/login/',
     studentSignup: '/api/auth/student/signup/',
     tokenRefresh: '/api/token/refresh/',
+    students: '/api/auth/students/',
   },
   exams: {
     list: '/api/exams/',
     create: '/api/exams/',
     detail: (id: number) => `/api/exams/${id}/`,
     studentExams: '/api/student-exams/',
-    startExam: (id: number) => `/api/student-exams/${id}/start_exam/`,
+    startExam: '/api/student-exams/start_exam/',
     submitAnswer: (id: number) => `/api/student-exams/${id}/submit_answer/`,
+    submitAnswers: (id: number) => `/api/student-exams/${id}/submit_answers/`,
     submitExam: (id: number) => `/api/student-exams/${id}/submit_exam/`,
   },
   swot: {
@@ -247,6 +396,12 @@ export const endpoints = {
     submit: '/api/swot/analyses/submit/',
     detail: (id: number) => `/api/swot/analyses/${id}/`,
   },
+  dashboard: {
+    counters: '/api/dashboard/counters/',
+  },
+  events: {
+    stream: '/api/events/stream/',
+  },
   messages: {
     list: '/api/messages/',
     send: '/api/messages/',
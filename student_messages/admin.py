@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Message
+from .models import Message, UnreadCounter
 
 
 @admin.register(Message)
@@ -8,3 +8,8 @@ class MessageAdmin(admin.ModelAdmin):
     list_filter = ['is_read', 'created_at']
     search_fields = ['student__full_name', 'title', 'message']
     readonly_fields = ['created_at']
+
+
+@admin.register(UnreadCounter)
+class UnreadCounterAdmin(admin.ModelAdmin):
+    list_display = ['professor', 'count']
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from student_messages.unread import rebuild_unread_counters
+
+
+class Command(BaseCommand):
+    help = 'Recount the unread-message counters from the messages table'
+
+    def handle(self, *args, **options):
+        counters = rebuild_unread_counters()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {counters} unread counters'))
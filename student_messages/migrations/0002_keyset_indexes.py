@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("student_messages", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["professor", "-created_at", "id"],
+                name="student_mes_profess_c4d5c7_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["student", "-created_at", "id"],
+                name="student_mes_student_5a90b3_idx",
+            ),
+        ),
+    ]
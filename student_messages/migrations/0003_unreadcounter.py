@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_unread(apps, schema_editor):
+    Message = apps.get_model("student_messages", "Message")
+    UnreadCounter = apps.get_model("student_messages", "UnreadCounter")
+    counts = dict(
+        Message.objects.filter(is_read=False)
+        .values("professor_id")
+        .annotate(total=Count("id"))
+        .values_list("professor_id", "total")
+    )
+    counts.setdefault(None, 0)
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(professor_id=professor_id, count=total) for professor_id, total in counts.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("student_messages", "0002_keyset_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UnreadCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "professor",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="unread_counter",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(count_unread, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:41
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def merge_unassigned_counters(apps, schema_editor):
+    # Concurrent first messages could create several unassigned rows
+    UnreadCounter = apps.get_model("student_messages", "UnreadCounter")
+    rows = UnreadCounter.objects.filter(professor__isnull=True).order_by("id")
+    first = rows.first()
+    if first is None:
+        return
+    total = rows.aggregate(total=Sum("count"))["total"]
+    rows.exclude(pk=first.pk).delete()
+    rows.filter(pk=first.pk).update(count=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("student_messages", "0003_unreadcounter"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_unassigned_counters, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="unreadcounter",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.comparison.Coalesce("professor", 0),
+                condition=models.Q(("professor__isnull", True)),
+                name="unique_unassigned_unread_counter",
+            ),
+        ),
+    ]
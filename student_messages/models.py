@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from accounts.models import User
 
 
@@ -25,6 +26,40 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['professor', '-created_at', 'id']),
+            models.Index(fields=['student', '-created_at', 'id']),
+        ]
     
     def __str__(self):
         return f"{self.student.full_name} - {self.title}"
+
+
+class UnreadCounter(models.Model):
+    """
+    Unread messages per professor, kept current by student_messages.unread.
+    The row with professor=None counts messages not addressed to anyone,
+    which every professor sees in their inbox.
+    """
+    professor = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='unread_counter',
+        null=True,
+        blank=True
+    )
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            # NULLs never collide in a unique column, so the single
+            # unassigned row gets its own partial unique index
+            models.UniqueConstraint(
+                Coalesce('professor', 0),
+                condition=models.Q(professor__isnull=True),
+                name='unique_unassigned_unread_counter'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.professor or 'Unassigned'}: {self.count}"
@@ -0,0 +1,36 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from .models import Message
+from .unread import adjust_unread
+
+
+# Sent with ``message`` by mark_read, which uses a conditional update and so
+# sends no post_save
+message_read = Signal()
+
+
+@receiver(pre_save, sender=Message)
+def remember_unread_state(sender, instance, **kwargs):
+    instance._unread_before = None
+    if instance.pk:
+        instance._unread_before = (
+            Message.objects.filter(pk=instance.pk).values_list('professor_id', 'is_read').first()
+        )
+
+
+@receiver(post_save, sender=Message)
+def message_saved(sender, instance, **kwargs):
+    before = getattr(instance, '_unread_before', None)
+    if before == (instance.professor_id, instance.is_read):
+        return
+    if before is not None and not before[1]:
+        adjust_unread(before[0], -1)
+    if not instance.is_read:
+        adjust_unread(instance.professor_id, 1)
+
+
+@receiver(post_delete, sender=Message)
+def message_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread(instance.professor_id, -1)
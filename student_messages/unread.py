@@ -0,0 +1,53 @@
+"""
+Denormalized unread-message counters.
+
+Every professor's unread count is their own UnreadCounter row plus the
+shared row for unassigned messages, so reading it is one indexed query no
+matter how many messages exist. Counters are adjusted with F() updates when
+a message is created, read, reassigned or deleted (see
+student_messages.signals); ``manage.py rebuild_unread_counters`` recounts
+them from the messages table.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import Message, UnreadCounter
+
+
+def adjust_unread(professor_id, delta):
+    """
+    Add delta to the counter of a professor (None for unassigned). A missing
+    row is created first; both kinds of row are unique, so concurrent
+    creates collapse into one.
+    """
+    if not delta:
+        return
+    counters = UnreadCounter.objects.filter(professor_id=professor_id)
+    if not counters.update(count=F('count') + delta):
+        UnreadCounter.objects.bulk_create([UnreadCounter(professor_id=professor_id)], ignore_conflicts=True)
+        counters.update(count=F('count') + delta)
+
+
+def unread_count(professor):
+    """Unread messages in a professor's inbox, including unassigned ones"""
+    return UnreadCounter.objects.filter(
+        Q(professor=professor) | Q(professor__isnull=True)
+    ).aggregate(total=Sum('count'))['total'] or 0
+
+
+def rebuild_unread_counters():
+    """Recount every counter from the messages table. Returns the number of counters."""
+    counts = dict(
+        Message.objects.filter(is_read=False)
+        .values('professor_id')
+        .annotate(total=Count('id'))
+        .values_list('professor_id', 'total')
+    )
+    counts.setdefault(None, 0)
+    with transaction.atomic():
+        UnreadCounter.objects.all().delete()
+        UnreadCounter.objects.bulk_create([
+            UnreadCounter(professor_id=professor_id, count=total)
+            for professor_id, total in counts.items()
+        ])
+    return len(counts)
@@ -2,20 +2,26 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import Q
+from backend.pagination import KeysetPagination
 from .models import Message
 from .serializers import MessageSerializer, MessageCreateSerializer
+from .signals import message_read
+from .unread import adjust_unread, unread_count
 
 
 class MessageViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = MessageSerializer
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         user = self.request.user
         if user.role == 'student':
-            return Message.objects.filter(student=user)
+            return Message.objects.filter(student=user).select_related('student')
         elif user.role == 'professor':
-            return Message.objects.filter(professor=user) | Message.objects.filter(professor__isnull=True)
+            # Own and unassigned messages in one query with the sender joined
+            return Message.objects.filter(Q(professor=user) | Q(professor__isnull=True)).select_related('student')
         return Message.objects.none()
     
     def get_serializer_class(self):
@@ -37,8 +43,10 @@ class MessageViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Only professors can mark messages as read'}, 
                           status=status.HTTP_403_FORBIDDEN)
         
-        message.is_read = True
-        message.save()
+        # Conditional update so concurrent clicks decrement the counter once
+        if Message.objects.filter(pk=message.pk, is_read=False).update(is_read=True):
+            adjust_unread(message.professor_id, -1)
+            message_read.send(sender=Message, message=message)
         return Response({'status': 'Message marked as read'})
     
     @action(detail=False, methods=['get'])
@@ -48,12 +56,4 @@ class MessageViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Only professors can check unread count'}, 
                           status=status.HTTP_403_FORBIDDEN)
         
-        count = Message.objects.filter(
-            professor=request.user,
-            is_read=False
-        ).count() + Message.objects.filter(
-            professor__isnull=True,
-            is_read=False
-        ).count()
-        
-        return Response({'count': count})
+        return Response({'count': unread_count(request.user)})
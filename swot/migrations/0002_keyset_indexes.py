@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("swot", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="swotanalysis",
+            index=models.Index(
+                fields=["student", "-created_at", "id"],
+                name="swot_swotan_student_70a1d7_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="swotanalysis",
+            index=models.Index(
+                fields=["-created_at", "id"], name="swot_swotan_created_6b771c_idx"
+            ),
+        ),
+    ]
@@ -33,6 +33,10 @@ class SWOTAnalysis(models.Model):
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = 'SWOT Analyses'
+        indexes = [
+            models.Index(fields=['student', '-created_at', 'id']),
+            models.Index(fields=['-created_at', 'id']),
+        ]
     
     def __str__(self):
         return f"{self.student.get_full_name()} - {self.created_at.strftime('%Y-%m-%d')}"
@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
+from backend.pagination import KeysetPagination
 from .models import SWOTQuestion, SWOTAnalysis, SWOTAnswer
 from .serializers import (
     SWOTQuestionSerializer,
@@ -21,15 +22,18 @@ class SWOTQuestionViewSet(viewsets.ReadOnlyModelViewSet):
 class SWOTAnalysisViewSet(viewsets.ModelViewSet):
     serializer_class = SWOTAnalysisSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         user = self.request.user
         if user.role == 'student':
-            return SWOTAnalysis.objects.filter(student=user)
+            queryset = SWOTAnalysis.objects.filter(student=user)
         elif user.role == 'professor':
             # Professors can see all analyses
-            return SWOTAnalysis.objects.all()
-        return SWOTAnalysis.objects.none()
+            queryset = SWOTAnalysis.objects.all()
+        else:
+            return SWOTAnalysis.objects.none()
+        return queryset.select_related('student').prefetch_related('answers__question')
     
     @action(detail=False, methods=['post'])
     def submit(self, request):
@@ -67,6 +71,6 @@ class SWOTAnalysisViewSet(viewsets.ModelViewSet):
         analyses = SWOTAnalysis.objects.filter(
             student=request.user,
             is_completed=True
-        )
+        ).select_related('student').prefetch_related('answers__question')
         serializer = self.get_serializer(analyses, many=True)
         return Response(serializer.data)